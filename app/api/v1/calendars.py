@@ -1,94 +1,85 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from tortoise.exceptions import DoesNotExist
-from tortoise.expressions import Q
 
-from app.core.security import require_active_user
-from app.models.calendar import Calendar
+from app.core.config import get_settings
+from app.core.security import public, require_active_user, require_roles
+from app.schemas.calendar import (
+    BundleManifest,
+    Lang,
+    LunarBatchRequest,
+    LunarBatchResponse,
+    LunarCompactResponse,
+    LunarEnvelope,
+    LunarLocalizedResponse,
+    LunarResponse,
+)
+from app.schemas.prayer import (
+    CountryPrayerTimesResponse,
+    NearestPrayerTimesBatchRequest,
+    NearestPrayerTimesBatchResponse,
+    NearestPrayerTimesResponse,
+    PrayerTimesRangeResponse,
+    PrayerTimesResponse,
+    Times,
+)
+from app.services.calendar_index import get_calendar_index, reload_calendar_index
+from app.services.calendar_store import CalendarStore
+from app.services.country_zones import DEFAULT_COUNTRY, country_timezone
+from app.services.dimensions import dimensions_digest, dimensions_version, load_dimensions
+from app.services.hijri import hijri_iso, hijri_isos, hijri_offset, hijri_version
+from app.services.http_cache import (
+    CachedResponse,
+    ResponseCache,
+    accepts_encoding,
+    etag_matches,
+    make_etag,
+    not_modified,
+)
+from app.services.ics import ICS_MEDIA_TYPE, iter_calendar, iter_lunar_events, iter_prayer_events
+from app.services.lunar_json import decode_cursor, encode_lunar_batch, encode_lunar_response, iter_lunar_ndjson
+from app.services.offline_bundle import bundle_timezone, encode_bundle
+from app.services.prayer_times import (
+    EVENTS,
+    compute_six_times,
+    country_prayer_times,
+    format_hhmm,
+    six_times_minutes,
+)
+from app.services.province_locator import get_province_locator
+from app.services.province_registry import ProvinceEntry, get_province
+from app.services.timezones import zone_info, zone_projection
 from app.repositories.task import TaskRepository
 from app.schemas.task import TaskRead, TaskCreate
 
 router = APIRouter(prefix="/calendar", tags=["calendar"])
 repo = TaskRepository()
+settings = get_settings()
 
 # app.py
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Path, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import date, timedelta, datetime, timezone
-from typing import Dict, Any, List, Tuple, Optional, Literal
-import os, json, math
-from app.models.country import Province
+from functools import lru_cache
+from typing import Dict, Any, List, Tuple, Optional, Literal, Union
+import os, gzip
+from bisect import bisect_left, bisect_right
+import numpy as np
 # app = FastAPI(title="Baghdad Lunar Calendar API", version="1.0")
 
-# You can override these via environment variables if your files live elsewhere.
-DATA_FILES = [
-    os.getenv("BAGHDAD_2025_PATH") or "app/data/calendar/astrology/lunar_calendar_baghdad_2025.json",
-    os.getenv("BAGHDAD_2026_PATH") or "app/data/calendar/astrology/lunar_calendar_baghdad_2026.json",
-]
+# Calendar files are served per year from CALENDAR_FILE_PATTERN; these env vars still pin single years.
+_FILE_OVERRIDES = {
+    year: path
+    for year, path in ((2025, os.getenv("BAGHDAD_2025_PATH")), (2026, os.getenv("BAGHDAD_2026_PATH")))
+    if path
+}
 
-
-def _first_existing_path(path: str) -> str | None:
-    """Return a real file path, trying with and without .json."""
-    candidates = [path]
-    if not path.endswith(".json"):
-        candidates.append(path + ".json")
-    for p in candidates:
-        if os.path.exists(p):
-            return p
-    return None
-
-
-def _read_json(path: str) -> Dict[str, Any]:
-    """Read a JSON file, handling optional UTF-8 BOM."""
-    with open(path, "r", encoding="utf-8") as f:
-        raw = f.read().lstrip("\ufeff").strip()
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"Failed to parse JSON in {path}: {e}") from e
-
-
-def _load_data() -> Tuple[Dict[str, Dict[str, Any]], str, str, List[str]]:
-    """
-    Load 'days' from the two calendar files and index by date string.
-    Returns:
-      - by_date: dict 'YYYY-MM-DD' -> day object
-      - min_date: earliest date string
-      - max_date: latest date string
-      - loaded_files: list of file paths actually loaded
-    """
-    by_date: Dict[str, Dict[str, Any]] = {}
-    min_d: str | None = None
-    max_d: str | None = None
-    loaded_files: List[str] = []
-
-    for configured in DATA_FILES:
-        path = _first_existing_path(configured)
-        if not path:
-            continue  # skip missing file
-        payload = _read_json(path)
-        loaded_files.append(path)
-        for d in payload.get("days", []):
-            ds = d.get("date")
-            if not isinstance(ds, str):
-                continue
-            by_date[ds] = d
-            if min_d is None or ds < min_d:
-                min_d = ds
-            if max_d is None or ds > max_d:
-                max_d = ds
-
-    if not by_date:
-        raise RuntimeError(
-            "No calendar data found. Ensure your files exist "
-            "(lunar_calendar_baghdad_2025[.json], lunar_calendar_baghdad_2026[.json]) "
-            "or set BAGHDAD_2025_PATH / BAGHDAD_2026_PATH."
-        )
-
-    return by_date, min_d or "", max_d or "", loaded_files
-
-
-BY_DATE, MIN_DATE, MAX_DATE, LOADED_FILES = _load_data()
+# Years load on first use, reload when their file changes and are evicted past the byte budget.
+calendar_store = CalendarStore(
+    settings.calendar_file_pattern,
+    overrides=_FILE_OVERRIDES,
+    max_bytes=settings.calendar_store_max_bytes,
+    check_interval=settings.calendar_store_check_seconds,
+)
 
 
 def _parse_iso(d: str) -> date:
@@ -102,58 +93,11 @@ def _parse_iso(d: str) -> date:
 # def health():
 #     return {
 #         "status": "ok",
-#         "available_date_range": {"min": MIN_DATE, "max": MAX_DATE},
-#         "files": LOADED_FILES,
-#         "total_days": len(BY_DATE),
+#         "calendar_store": calendar_store.stats(),
 #     }
 import pytz  # pip install pytz
 
 
-class RelatedBase(BaseModel):
-    id: int
-    en_name: str
-    ar_name: str
-    fa_name: str
-
-class CalendarItem(BaseModel):
-    id: int
-    # always include the UTC day stored in DB
-    utc_date: date = Field(..., description="UTC calendar date of the record")
-    # also expose the date as seen in the requested country's local time
-    local_date: date = Field(..., description="Local date for requested country")
-    moon_sign: RelatedBase
-    phase: RelatedBase
-    recommendation: RelatedBase
-
-    class Config:
-        orm_mode = True
-class LunarResponse(BaseModel):
-    country: str
-    timezone: str
-    start_local: date
-    end_local: date
-    start_utc: date
-    end_utc: date
-    items: List[CalendarItem]
-
-def _country_to_timezone(country_shortcode: str) -> str:
-    """
-    Resolve an IANA timezone string from a 2-letter ISO country code using pytz.
-    Prefer the most populous zone if multiple are available.
-    """
-    cc = (country_shortcode or "IQ").upper()
-    try:
-        zones = pytz.country_timezones(cc)
-        if not zones:
-            return "UTC"
-        # crude preference: pick one with a city (no Etc/*), else first
-        for z in zones:
-            if not z.startswith("Etc/"):
-                return z
-        return zones[0]
-    except Exception:
-        return "UTC"
-
 def _parse_date_yyyy_mm_dd(value: Optional[str], field_name: str) -> Optional[date]:
     if value is None:
         return None
@@ -171,12 +115,15 @@ def _month_bounds(d: date) -> (date, date):
     last = next_month_first - timedelta(days=1)
     return first, last
 
+@lru_cache(maxsize=4096)
 def _local_range_to_utc_date_span(
     start_local: date, end_local: date, tzname: str
 ) -> (datetime, datetime, date, date):
     """
     Convert a local [start_date .. end_date] (inclusive by local calendar date)
     into UTC datetime span and the inclusive UTC date bounds that intersect that local span.
+    Pure function of its arguments, so results are memoized per (range, zone).
+    Stays on pytz so the bounds agree with ZoneProjection's transition table.
     """
     tz = pytz.timezone(tzname)
     # local midnight at start
@@ -193,154 +140,248 @@ def _local_range_to_utc_date_span(
     return start_utc_dt, end_utc_dt, start_utc_date, end_utc_date
 
 
-def _date_iter(d0: date, d1: date):
-    cur = d0
-    while cur <= d1:
-        yield cur
-        cur = cur + timedelta(days=1)
+# Serialized /lunar bodies; clients must revalidate, which is cheap thanks to the ETag.
+lunar_cache = ResponseCache(maxsize=settings.lunar_cache_size)
+LUNAR_CACHE_HEADERS = {"Cache-Control": "private, no-cache"}
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _resolve_local_range(
+    tzname: str, start_local: Optional[date], end_local: Optional[date]
+) -> Tuple[date, date, date, bool]:
+    """
+    (start_local, end_local, today_local, is_default_range) for a request;
+    defaults to the whole current month in the zone when either bound is missing.
+    """
+    today_local = datetime.now(zone_info(tzname)).date()
+    if start_local is None or end_local is None:
+        month_start, month_end = _month_bounds(today_local)
+        return month_start, month_end, today_local, True
+    if start_local > end_local:
+        raise HTTPException(status_code=422, detail="start cannot be after end")
+    return start_local, end_local, today_local, False
+
+
+def _check_span(start_local: date, end_local: date) -> int:
+    """Number of local days requested; 422 past LUNAR_MAX_SPAN_DAYS."""
+    days = (end_local - start_local).days + 1
+    if days > settings.lunar_max_span_days:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Range covers {days} days; the limit is {settings.lunar_max_span_days}",
+        )
+    return days
+
+
+def _lunar_envelope(country: str, tzname: str, start_local: date, end_local: date) -> LunarEnvelope:
+    # Convert that local span to UTC date window
+    _, _, start_utc_date, end_utc_date = _local_range_to_utc_date_span(start_local, end_local, tzname)
+    return LunarEnvelope(
+        country=country,
+        timezone=tzname,
+        start_local=start_local,
+        end_local=end_local,
+        start_utc=start_utc_date,
+        end_utc=end_utc_date,
+    )
+
 
+def _next_local_midnight(today_local: date, tzname: str) -> float:
+    return datetime.combine(today_local + timedelta(days=1), datetime.min.time(), tzinfo=zone_info(tzname)).timestamp()
 
-def _has_attr(model_cls, name: str) -> bool:
-    # Tortoise models expose fields via _meta.fields_map
-    return hasattr(model_cls, "_meta") and (name in getattr(model_cls._meta, "fields_map", {}))
 
-@router.get("/lunar", response_model=LunarResponse)
+@router.get("/lunar", response_model=Union[LunarResponse, LunarLocalizedResponse, LunarCompactResponse])
 async def get_lunar_range(
+    request: Request,
     start: Optional[str] = Query(None, description="Start date in YYYY-MM-DD (local to country)"),
     end: Optional[str] = Query(None, description="End date in YYYY-MM-DD (local to country)"),
     country_shortcode: str = Query("IQ", min_length=2, max_length=2, description="ISO 3166-1 alpha-2 country code"),
+    format: Optional[Literal["json", "ndjson"]] = Query(
+        None, description="'ndjson' streams the envelope then one item per line (also via Accept: application/x-ndjson)"
+    ),
+    lang: Optional[Lang] = Query(None, description="Return a single language: relations become {id, name}"),
+    compact: bool = Query(False, description="Send dimension rows once and items as id tuples (see `fields`)"),
+    limit: Optional[int] = Query(
+        None, ge=1, le=settings.lunar_page_size, description="Items per page (JSON formats); defaults to the maximum"
+    ),
+    cursor: Optional[str] = Query(None, description="`next` value from the previous page"),
 ):
     """
     Returns calendar entries (with related moon_sign, phase, recommendation) for the requested local-date range.
     Dates are interpreted in the given country's local timezone; results are mapped to the underlying UTC-day records.
 
     If no start/end are provided, returns the current month's data in the given country's timezone.
+
+    Serialized responses are cached per (timezone, local range, data version) and carry a strong ETag;
+    a matching If-None-Match is answered with 304. The ndjson format is streamed and never cached.
+
+    `lang` projects every relation to one language (LunarLocalizedResponse); `compact` lists the
+    referenced dimension rows once and encodes items as tuples (LunarCompactResponse).
+
+    Ranges are capped at LUNAR_MAX_SPAN_DAYS. JSON responses are paged (keyset on the UTC day):
+    pass the returned `next` as `cursor`, with the same other parameters, until it is null.
     """
 
     # Resolve timezone from country
-    tzname = _country_to_timezone(country_shortcode)
+    country = country_shortcode.upper()
+    tzname = country_timezone(country)
 
     # Decide local date range
-    today_local = datetime.now(pytz.timezone(tzname)).date()
-    if start is None or end is None:
-        # default: whole current month in local tz
-        month_start, month_end = _month_bounds(today_local)
-        start_local = month_start
-        end_local = month_end
-    else:
-        start_local = _parse_date_yyyy_mm_dd(start, "start")  # type: ignore
-        end_local = _parse_date_yyyy_mm_dd(end, "end")        # type: ignore
-        if start_local > end_local:
-            raise HTTPException(status_code=422, detail="start cannot be after end")
-
-    # Convert that local span to UTC date window
-    _, _, start_utc_date, end_utc_date = _local_range_to_utc_date_span(start_local, end_local, tzname)
+    start_local, end_local, today_local, is_default_range = _resolve_local_range(
+        tzname,
+        _parse_date_yyyy_mm_dd(start, "start"),
+        _parse_date_yyyy_mm_dd(end, "end"),
+    )
+    _check_span(start_local, end_local)
 
-    # Build query for either schema flavor (single DateField vs split CharFields)
-    has_single_date = _has_attr(Calendar, "utc_date")
+    if format is None:
+        format = "ndjson" if NDJSON_MEDIA_TYPE in request.headers.get("accept", "") else "json"
 
-    if has_single_date:
-        # Simple range filter
-        queryset = (
-            Calendar.filter(utc_date__gte=start_utc_date, utc_date__lte=end_utc_date)
-            .prefetch_related("moon_sign", "phase", "recommendation")
-            .order_by("utc_date")
-        )
-    else:
-        # Generate OR of (Y,M,D) tuples for all UTC dates in the span
-        q = Q()
-        for d in _date_iter(start_utc_date, end_utc_date):
-            q |= Q(
-                utc_year=str(d.year).zfill(4),
-                utc_month=str(d.month).zfill(2),
-                utc_day=str(d.day).zfill(2),
-            )
-        queryset = (
-            Calendar.filter(q)
-            .prefetch_related("moon_sign", "phase", "recommendation")
-            .order_by("utc_year", "utc_month", "utc_day")
-        )
-
-    rows = await queryset
+    if format == "ndjson":
+        if compact:
+            raise HTTPException(status_code=422, detail="compact is not available with the ndjson format")
+        envelope = _lunar_envelope(country, tzname, start_local, end_local)
+        return StreamingResponse(iter_lunar_ndjson(envelope, lang), media_type=NDJSON_MEDIA_TYPE)
 
-    # Shape response items with both UTC and local dates
-    items: List[Dict[str, Any]] = []
-    tz = pytz.timezone(tzname)
+    after_ordinal = None
+    if cursor is not None:
+        try:
+            after_ordinal = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=422, detail="Invalid cursor")
+    page_size = limit or settings.lunar_page_size
+
+    data_version = (get_calendar_index().version, dimensions_version(), hijri_version())
+    cache_key = (tzname, country, start_local, end_local, lang, compact, after_ordinal, page_size, data_version)
+    cached = lunar_cache.get(cache_key)
+    if cached is not None and etag_matches(request, cached.etag):
+        return not_modified(cached.etag, LUNAR_CACHE_HEADERS)
+
+    if cached is None:
+        # spliced from pre-encoded day fragments; skips LunarResponse validation entirely
+        envelope = _lunar_envelope(country, tzname, start_local, end_local)
+        body = encode_lunar_response(envelope, lang, compact, after_ordinal, page_size)
+        # the default month rolls over at local midnight; explicit ranges live until evicted
+        expires_at = _next_local_midnight(today_local, tzname) if is_default_range else None
+        cached = lunar_cache.put(cache_key, body, expires_at=expires_at)
+        if etag_matches(request, cached.etag):
+            return not_modified(cached.etag, LUNAR_CACHE_HEADERS)
+
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"ETag": cached.etag, **LUNAR_CACHE_HEADERS},
+    )
 
-    for r in rows:
-        # get the UTC date stored in DB
-        if has_single_date:
-            utc_d: date = r.utc_date  # type: ignore[attr-defined]
-        else:
-            # combine split fields
-            utc_d = date(int(r.utc_year), int(r.utc_month), int(r.utc_day))
-
-        # compute what local calendar date that UTC day corresponds to at local time
-        # We choose 12:00 UTC on that day to avoid DST edge at midnight UTC -> local date won't be off by one.
-        local_date = datetime.combine(utc_d, datetime.min.time(), tzinfo=timezone.utc).astimezone(tz).date()
-
-        items.append(
-            {
-                "id": r.id,
-                "utc_date": utc_d,
-                "local_date": local_date,
-                "moon_sign": {
-                    "id": r.moon_sign.id,
-                    "en_name": r.moon_sign.en_name,
-                    "ar_name": r.moon_sign.ar_name,
-                    "fa_name": r.moon_sign.fa_name,
-                },
-                "phase": {
-                    "id": r.phase.id,
-                    "en_name": r.phase.en_name,
-                    "ar_name": r.phase.ar_name,
-                    "fa_name": r.phase.fa_name,
-                },
-                "recommendation": {
-                    "id": r.recommendation.id,
-                    "en_name": r.recommendation.en_name,
-                    "ar_name": r.recommendation.ar_name,
-                    "fa_name": r.recommendation.fa_name,
-                },
-            }
+@router.post("/lunar/batch", response_model=LunarBatchResponse)
+async def get_lunar_batch(payload: LunarBatchRequest):
+    """
+    Lunar calendars for several (country, local range) specs in one call. The union UTC window
+    is sliced once and projected once per distinct timezone, then fanned out to each spec.
+    Results follow the order of `specs`; `lang` applies to all of them. Results are not paged:
+    each range is capped at LUNAR_MAX_SPAN_DAYS and their sum at LUNAR_BATCH_MAX_DAYS.
+    """
+    envelopes = []
+    total_days = 0
+    for spec in payload.specs:
+        country = spec.country_shortcode.upper()
+        tzname = country_timezone(country)
+        start_local, end_local, _, _ = _resolve_local_range(tzname, spec.start, spec.end)
+        total_days += _check_span(start_local, end_local)
+        envelopes.append(_lunar_envelope(country, tzname, start_local, end_local))
+    if total_days > settings.lunar_batch_max_days:
+        raise HTTPException(
+            status_code=422, detail=f"Batch covers {total_days} days; the limit is {settings.lunar_batch_max_days}"
         )
+    return Response(content=encode_lunar_batch(envelopes, payload.lang), media_type="application/json")
 
-    return LunarResponse(
-        country=country_shortcode.upper(),
-        timezone=tzname,
-        start_local=start_local,
-        end_local=end_local,
-        start_utc=start_utc_date,
-        end_utc=end_utc_date,
-        items=items,
+@router.post("/lunar/reload", dependencies=[Depends(require_roles("admin"))])
+async def reload_lunar_index():
+    """
+    Rebuild this worker's in-process calendar index and dimension tables from
+    the database. Call it after the loader has written new calendar rows.
+    """
+    await load_dimensions()
+    index = await reload_calendar_index()
+    return {
+        "version": index.version,
+        "total_days": len(index),
+        "min_date": index.min_date,
+        "max_date": index.max_date,
+    }
+
+@router.get("/lunar/{country_shortcode}/feed.ics", response_class=StreamingResponse)
+@public  # calendar apps can't send an Authorization header
+async def get_lunar_feed(
+    request: Request,
+    country_shortcode: str,
+    start: Optional[str] = Query(None, description="First local date, YYYY-MM-DD (defaults to today in the country)"),
+    days: int = Query(settings.ics_feed_days, ge=1, le=settings.lunar_max_span_days, description="Number of days"),
+    lang: Optional[Lang] = Query(None, description="Language of the events (English by default)"),
+):
+    """
+    iCalendar feed with one all-day event per day: moon sign and phase as the title, the
+    recommendation as the description. Streamed from the in-process index; the ETag follows
+    the request and the content digests of the index and dimension tables, so it is the same
+    on every worker and unchanged polls are answered with 304.
+    """
+    country = country_shortcode.upper()
+    tzname = country_timezone(country)
+    today_local = datetime.now(zone_info(tzname)).date()
+    start_local = _parse_date_yyyy_mm_dd(start, "start") or today_local
+    end_local = start_local + timedelta(days=days - 1)
+
+    # pin one snapshot so a concurrent reload can't mix versions mid-stream
+    index = get_calendar_index()
+    etag = make_etag(
+        repr(("lunar.ics", country, tzname, start_local, days, lang, index.digest, dimensions_digest())).encode()
+    )
+    headers = _max_age_headers(_next_local_midnight(today_local, tzname), shared=True)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+
+    _, _, start_utc, end_utc = _local_range_to_utc_date_span(start_local, end_local, tzname)
+    span = index.span(start_utc, end_utc)
+    local_ordinals = zone_projection(tzname).project(index.ordinals, span.start, span.stop)
+    # the UTC window overhangs the local one by a day at either end; keep only
+    # rows whose local date is in [start, start + days) (local ordinals are sorted)
+    lo = bisect_left(local_ordinals, start_local.toordinal())
+    hi = bisect_right(local_ordinals, end_local.toordinal())
+    span, local_ordinals = range(span.start + lo, span.start + hi), local_ordinals[lo:hi]
+    return StreamingResponse(
+        iter_calendar(f"Lunar calendar ({country})", iter_lunar_events(country, index, span, local_ordinals, lang)),
+        media_type=ICS_MEDIA_TYPE,
+        headers={"ETag": etag, **headers},
     )
 
-# @router.get("/lunar-bc")
+@router.get("/lunar-bc")
 def get_lunar_range_bc(
     start: str = Query(..., description="Start date in YYYY-MM-DD"),
     end: str = Query(..., description="End date in YYYY-MM-DD"),
-    # include_missing: bool = Query(False, description="Include placeholders for dates that aren't in the files"),
+    include_missing: bool = Query(False, description="Include placeholders for dates that aren't in the files"),
     country_shortcode: str = "IQ"
 ):
+    """
+    Calendar days straight from the data files, without the database. Dates are the
+    files' own (local Baghdad) dates; `missing` lists requested dates no file covers.
+    """
     start_d = _parse_iso(start)
     end_d = _parse_iso(end)
     if start_d > end_d:
         raise HTTPException(status_code=400, detail="start must be <= end")
+    _check_span(start_d, end_d)
 
     results: List[Dict[str, Any]] = []
     missing: List[str] = []
 
-    cur = start_d
-    while cur <= end_d:
-        key = cur.isoformat()
-        entry = BY_DATE.get(key)
+    for cur, entry in calendar_store.iter_days(start_d, end_d):
         if entry is not None:
             results.append(entry)
         else:
+            key = cur.isoformat()
             missing.append(key)
             if include_missing:
                 results.append({"date": key, "available": False})
-        cur = cur + timedelta(days=1)
 
     payload: Dict[str, Any] = {
         "range": {"start": start, "end": end},
@@ -352,140 +393,193 @@ def get_lunar_range_bc(
     return JSONResponse(payload)
 
 
-class Times(BaseModel):
-    fajr: str            # اذان صبح
-    sunrise: str         # طلوع آفتاب
-    dhuhr: str           # اذان ظهر
-    sunset: str          # غروب آفتاب
-    maghrib: str         # اذان مغرب
-    midnight: str        # نیمه شب
-
-
-class PrayerTimesResponse(BaseModel):
-    province_code: str
-    city_name: str
-    date: str
-    lat: float
-    lng: float
-    tz: float
-    params: dict
-    times: Times
-def _equation_of_time_and_declination(n: int):
-    gamma = 2 * math.pi / 365 * (n - 1)
-    eot = 229.18 * (
-        0.000075
-        + 0.001868 * math.cos(gamma)
-        - 0.032077 * math.sin(gamma)
-        - 0.014615 * math.cos(2 * gamma)
-        - 0.040849 * math.sin(2 * gamma)
+PRAYER_CSV_HEADER = ("date,%s\n" % ",".join(EVENTS)).encode()
+
+
+def _iter_prayer_rows(first: date, minutes: Dict[str, Any], hijri_offset_days: int = 0, chunk_days: int = 366):
+    """
+    (iso date bytes, Hijri date JSON bytes, [HH:MM bytes per event]) per day,
+    formatted a chunk at a time.
+    """
+    total = len(minutes["fajr"])
+    for lo in range(0, total, chunk_days):
+        hi = min(lo + chunk_days, total)
+        columns = [format_hhmm(minutes[event][lo:hi]) for event in EVENTS]
+        ordinals = range(first.toordinal() + lo, first.toordinal() + hi)
+        hijris = hijri_isos([o + hijri_offset_days for o in ordinals])
+        for i, ordinal in enumerate(ordinals):
+            hijri = b'"%s"' % hijris[i].encode() if hijris[i] else b"null"
+            yield date.fromordinal(ordinal).isoformat().encode(), hijri, [col[i].encode() for col in columns]
+
+
+def _iter_prayer_json(head: bytes, first: date, minutes: Dict[str, Any], hijri_offset_days: int = 0):
+    yield head + b',"days":['
+    sep = b""
+    for day, hijri, times in _iter_prayer_rows(first, minutes, hijri_offset_days):
+        fields = b",".join(b'"%s":"%s"' % (event.encode(), t) for event, t in zip(EVENTS, times))
+        yield b'%s{"date":"%s","hijri_date":%s,"times":{%s}}' % (sep, day, hijri, fields)
+        sep = b","
+    yield b"]}"
+
+
+def _iter_prayer_csv(first: date, minutes: Dict[str, Any]):
+    yield PRAYER_CSV_HEADER
+    for day, _, times in _iter_prayer_rows(first, minutes):
+        yield day + b"," + b",".join(times) + b"\n"
+
+
+async def _get_province_with_coordinates(province_code: str) -> ProvinceEntry:
+    city = await get_province(province_code)
+    if not city:
+        raise HTTPException(status_code=404, detail="Province code not found")
+    if city.lat is None or city.lng is None or city.tz is None:
+        raise HTTPException(status_code=422, detail="lat/lng/tz not set for this province")
+    return city
+
+
+def _province_tz(city: ProvinceEntry) -> timezone:
+    return timezone(timedelta(hours=int(city.tz), minutes=int(round((city.tz - int(city.tz)) * 60))))
+
+
+def _province_today(city: ProvinceEntry) -> date:
+    return datetime.now(tz=_province_tz(city)).date()
+
+
+# Serialized /prayer-times/{code} bodies, dropped at the province's next local midnight.
+prayer_cache = ResponseCache(maxsize=settings.prayer_cache_size)
+
+
+def _province_day_end(tz: timezone, today: date) -> float:
+    return datetime.combine(today + timedelta(days=1), datetime.min.time(), tzinfo=tz).timestamp()
+
+
+def _max_age_headers(expires_at: float, shared: bool = False) -> Dict[str, str]:
+    # the body may be reused until `expires_at` (a local midnight); only @public routes
+    # pass shared=True, so a CDN never hands an auth-gated response to anonymous clients
+    max_age = max(0, int(expires_at - datetime.now(timezone.utc).timestamp()))
+    return {"Cache-Control": f"{'public' if shared else 'private'}, max-age={max_age}"}
+
+
+# ---------------------------
+# Registered ahead of /prayer-times/{province_code}, which would otherwise capture "nearest".
+@router.get("/prayer-times/nearest", response_model=NearestPrayerTimesResponse)
+async def get_prayer_times_nearest(
+    lat: float = Query(..., ge=-90.0, le=90.0),
+    lng: float = Query(..., ge=-180.0, le=180.0),
+    date_str: Optional[str] = Query(None, description="YYYY-MM-DD (defaults to today in the nearest province)"),
+    fajr_angle: float = Query(17.7, ge=8.0, le=30.0, description="Twilight angle for Fajr"),
+    maghrib_offset_min: float = Query(4.0, ge=0.0, le=20.0, description="Minutes after sunset for Maghrib"),
+    max_distance_km: Optional[float] = Query(None, gt=0, description="404 when the nearest province is farther"),
+):
+    """
+    Prayer times at arbitrary coordinates. The nearest province (by great-circle distance to its
+    coordinates) supplies the UTC offset and the name; the times are computed for the point itself.
+    """
+    found = get_province_locator().nearest(lat, lng)
+    if found is None or (max_distance_km is not None and found[1] > max_distance_km):
+        raise HTTPException(status_code=404, detail="No province found near these coordinates")
+    city, distance_km = found
+
+    if date_str:
+        try:
+            the_date = date.fromisoformat(date_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    else:
+        the_date = _province_today(city)
+
+    times_dt = compute_six_times(
+        the_date,
+        lat,
+        lng,
+        city.tz,
+        fajr_angle=fajr_angle,
+        maghrib_offset_min=maghrib_offset_min,
+        midnight_mode="maghrib_to_fajr",
     )
-    decl = (
-        0.006918
-        - 0.399912 * math.cos(gamma)
-        + 0.070257 * math.sin(gamma)
-        - 0.006758 * math.cos(2 * gamma)
-        + 0.000907 * math.sin(2 * gamma)
-        - 0.002697 * math.cos(3 * gamma)
-        + 0.00148 * math.sin(3 * gamma)
+    return NearestPrayerTimesResponse(
+        province_code=city.iso_3166_2,
+        city_name=city.name,
+        date=the_date.isoformat(),
+        hijri_date=hijri_iso(the_date.toordinal() + hijri_offset(city.country_code)),
+        lat=lat,
+        lng=lng,
+        tz=city.tz,
+        params={
+            "fajr_angle": fajr_angle,
+            "midnight_mode": "maghrib_to_fajr",
+        },
+        times=Times(**{event: dt.strftime("%H:%M") for event, dt in times_dt.items()}),
+        distance_km=round(distance_km, 3),
     )
-    return eot, decl
-
-def _solar_noon_minutes(lon_east_deg: float, tz_hours: float, eot_min: float) -> float:
-    time_offset = eot_min + 4 * lon_east_deg - 60 * tz_hours
-    return 720 - time_offset
-
-def _event_time_by_zenith(lat_rad: float, decl: float, solar_noon_min: float, zenith_deg: float, sign: int) -> float:
-    # sign -1 = morning, +1 = evening
-    zen = math.radians(zenith_deg)
-    cos_omega = (math.cos(zen) - math.sin(lat_rad) * math.sin(decl)) / (math.cos(lat_rad) * math.cos(decl))
-    cos_omega = max(-1.0, min(1.0, cos_omega))
-    omega_deg = math.degrees(math.acos(cos_omega))
-    return solar_noon_min + sign * 4 * omega_deg
-
-def _to_local_datetime(d: date, minutes_from_midnight: float, tz_hours: float) -> datetime:
-    m = minutes_from_midnight
-    # normalize across day bounds
-    while m < 0:
-        d = d - timedelta(days=1)
-        m += 1440
-    while m >= 1440:
-        d = d + timedelta(days=1)
-        m -= 1440
-    hh = int(m // 60)
-    mm = int(round(m % 60))
-    if mm == 60:
-        mm = 0
-        hh += 1
-    tz = timezone(timedelta(hours=int(tz_hours), minutes=int(round((tz_hours - int(tz_hours)) * 60))))
-    return datetime(d.year, d.month, d.day, hh, mm, tzinfo=tz)
-
-def compute_six_times(
-    the_date: date,
-    lat_deg: float,
-    lon_east_deg: float,
-    tz_hours: float,
-    *,
-    fajr_angle: float = 17.7,
-    maghrib_offset_min: float = 4.0,
-    midnight_mode: Literal["maghrib_to_fajr", "sunset_to_sunrise"] = "maghrib_to_fajr",
-):
-    lat_rad = math.radians(lat_deg)
-    n = the_date.timetuple().tm_yday
-    eot, decl = _equation_of_time_and_declination(n)
-    solar_noon_min = _solar_noon_minutes(lon_east_deg, tz_hours, eot)
-
-    # Sunrise/Sunset with refraction & solar radius
-    sunrise_min = _event_time_by_zenith(lat_rad, decl, solar_noon_min, 90.833, -1)
-    sunset_min  = _event_time_by_zenith(lat_rad, decl, solar_noon_min, 90.833, +1)
-
-    # Fajr at twilight angle
-    fajr_zenith = 90 + fajr_angle
-    fajr_min = _event_time_by_zenith(lat_rad, decl, solar_noon_min, fajr_zenith, -1)
-
-    # Dhuhr (solar noon)
-    dhuhr_min = solar_noon_min
-
-    # Maghrib as sunset + offset (set 0 to equal sunset)
-    maghrib_min = sunset_min + maghrib_offset_min
-
-    # Midnight (nisf al-layl)
-    if midnight_mode == "maghrib_to_fajr":
-        start_dt = _to_local_datetime(the_date, maghrib_min, tz_hours)
-        end_dt = _to_local_datetime(the_date, fajr_min, tz_hours)
-        if end_dt <= start_dt:
-            end_dt = end_dt + timedelta(days=1)
-    else:  # "sunset_to_sunrise"
-        start_dt = _to_local_datetime(the_date, sunset_min, tz_hours)
-        end_dt = _to_local_datetime(the_date, sunrise_min, tz_hours)
-        if end_dt <= start_dt:
-            end_dt = end_dt + timedelta(days=1)
-    midnight_dt = start_dt + (end_dt - start_dt) / 2
 
-    return {
-        "fajr": _to_local_datetime(the_date, fajr_min, tz_hours),
-        "sunrise": _to_local_datetime(the_date, sunrise_min, tz_hours),
-        "dhuhr": _to_local_datetime(the_date, dhuhr_min, tz_hours),
-        "sunset": _to_local_datetime(the_date, sunset_min, tz_hours),
-        "maghrib": _to_local_datetime(the_date, maghrib_min, tz_hours),
-        "midnight": midnight_dt,
+
+@router.post("/prayer-times/nearest/batch", response_model=NearestPrayerTimesBatchResponse)
+async def get_prayer_times_nearest_batch(payload: NearestPrayerTimesBatchRequest):
+    """
+    /prayer-times/nearest for many points: one vectorized nearest-province pass and one
+    batched evaluation for all of them. Results follow the order of `points`.
+    """
+    lats = [p.lat for p in payload.points]
+    lngs = [p.lng for p in payload.points]
+    found = get_province_locator().nearest_many(lats, lngs)
+    if not found:
+        raise HTTPException(status_code=404, detail="No province found near these coordinates")
+
+    days = [payload.day or _province_today(city) for city, _ in found]
+    minutes = six_times_minutes(
+        np.array([d.toordinal() for d in days]),
+        np.array(lats),
+        np.array(lngs),
+        np.array([city.tz for city, _ in found]),
+        fajr_angle=payload.fajr_angle,
+        maghrib_offset_min=payload.maghrib_offset_min,
+        midnight_mode="maghrib_to_fajr",
+    )
+    columns = {event: format_hhmm(minutes[event]).tolist() for event in EVENTS}
+    hijris = hijri_isos([d.toordinal() + hijri_offset(city.country_code) for d, (city, _) in zip(days, found)])
+    params = {
+        "fajr_angle": payload.fajr_angle,
+        "midnight_mode": "maghrib_to_fajr",
     }
+    results = [
+        NearestPrayerTimesResponse(
+            province_code=city.iso_3166_2,
+            city_name=city.name,
+            date=days[i].isoformat(),
+            hijri_date=hijris[i],
+            lat=lats[i],
+            lng=lngs[i],
+            tz=city.tz,
+            params=params,
+            times=Times(**{event: columns[event][i] for event in EVENTS}),
+            distance_km=round(distance_km, 3),
+        )
+        for i, (city, distance_km) in enumerate(found)
+    ]
+    return NearestPrayerTimesBatchResponse(params=params, results=results)
+
 
-# ---------------------------
 @router.get("/prayer-times/{province_code}", response_model=PrayerTimesResponse)
 async def get_prayer_times_for_province(
+    request: Request,
     province_code: str,
     date_str: Optional[str] = Query(None, description="YYYY-MM-DD (defaults to today)"),
     fajr_angle: float = Query(17.7, ge=8.0, le=30.0, description="Twilight angle for Fajr"),
     maghrib_offset_min: float = Query(4.0, ge=0.0, le=20.0, description="Minutes after sunset for Maghrib"),
     # midnight_mode: Literal["maghrib_to_fajr", "sunset_to_sunrise"] = Query("maghrib_to_fajr"),
 ):
-    city = await Province.get_or_none(iso_3166_2=province_code)
-    if not city:
-        raise HTTPException(status_code=404, detail="Province code not found")
-    if city.lat is None or city.lng is None or city.tz is None:
-        raise HTTPException(status_code=422, detail="lat/lng/tz not set for this province")
+    """
+    The six prayer times of one local date. Serialized bodies are cached per (province, date,
+    parameters) until the province's next local midnight and carry a strong ETag, with
+    `Cache-Control: private, max-age` set to the seconds left in the province's day; a matching
+    If-None-Match is answered with 304.
+    """
+    city = await _get_province_with_coordinates(province_code)
 
     # parse date or use today in that locale's tz
+    tz = _province_tz(city)
+    today = datetime.now(tz=tz).date()
     if date_str:
         try:
             the_date = date.fromisoformat(date_str)
@@ -493,9 +587,18 @@ async def get_prayer_times_for_province(
             raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
     else:
         # "today" relative to province tz
-        tz = timezone(timedelta(hours=int(city.tz), minutes=int(round((city.tz - int(city.tz)) * 60))))
-        the_date = datetime.now(tz=tz).date()
-
+        the_date = today
+
+    # the entry itself is part of the key, so edited coordinates never hit a stale body
+    cache_key = (city, the_date, fajr_angle, maghrib_offset_min, hijri_version())
+    cached = prayer_cache.get(cache_key)
+    if cached is not None:
+        headers = _max_age_headers(cached.expires_at)
+        if etag_matches(request, cached.etag):
+            return not_modified(cached.etag, headers)
+        return Response(content=cached.body, media_type="application/json", headers={"ETag": cached.etag, **headers})
+
+    # computed from the registry entry: no database round trip on a miss
     times_dt = compute_six_times(
         the_date,
         city.lat,
@@ -505,14 +608,13 @@ async def get_prayer_times_for_province(
         maghrib_offset_min=maghrib_offset_min,
         midnight_mode="maghrib_to_fajr",
     )
-
-    def fmt(dt: datetime) -> str:
-        return dt.strftime("%H:%M")
+    times = {event: dt.strftime("%H:%M") for event, dt in times_dt.items()}
 
     payload = PrayerTimesResponse(
         province_code=city.iso_3166_2,
         city_name=city.name,
         date=the_date.isoformat(),
+        hijri_date=hijri_iso(the_date.toordinal() + hijri_offset(city.country_code)),
         lat=city.lat,
         lng=city.lng,
         tz=city.tz,
@@ -522,13 +624,236 @@ async def get_prayer_times_for_province(
             "midnight_mode": "maghrib_to_fajr",
             # "zenith_sunrise_sunset": 90.833,
         },
-        times=Times(
-            fajr=fmt(times_dt["fajr"]),
-            sunrise=fmt(times_dt["sunrise"]),
-            dhuhr=fmt(times_dt["dhuhr"]),
-            sunset=fmt(times_dt["sunset"]),
-            maghrib=fmt(times_dt["maghrib"]),
-            midnight=fmt(times_dt["midnight"]),
-        ),
+        times=Times(**times),
+    )
+    expires_at = _province_day_end(tz, today)
+    cached = prayer_cache.put(cache_key, payload.model_dump_json().encode(), expires_at=expires_at)
+    headers = _max_age_headers(expires_at)
+    if etag_matches(request, cached.etag):
+        return not_modified(cached.etag, headers)
+    return Response(content=cached.body, media_type="application/json", headers={"ETag": cached.etag, **headers})
+
+
+@router.get("/prayer-times/{province_code}/range", response_model=PrayerTimesRangeResponse)
+async def get_prayer_times_range(
+    province_code: str,
+    start: str = Query(..., description="First local date, YYYY-MM-DD"),
+    end: str = Query(..., description="Last local date (inclusive), YYYY-MM-DD"),
+    fajr_angle: float = Query(17.7, ge=8.0, le=30.0, description="Twilight angle for Fajr"),
+    maghrib_offset_min: float = Query(4.0, ge=0.0, le=20.0, description="Minutes after sunset for Maghrib"),
+    format: Literal["json", "csv"] = Query("json", description="'csv' streams one row per day"),
+):
+    """
+    Prayer times for every day of a local date range (for example a monthly timetable) in one call.
+    All days are computed in one batched evaluation; the times are identical to
+    /prayer-times/{province_code} for each date. The body is streamed, capped at PRAYER_MAX_SPAN_DAYS.
+    """
+    city = await _get_province_with_coordinates(province_code)
+    start_d = _parse_date_yyyy_mm_dd(start, "start")
+    end_d = _parse_date_yyyy_mm_dd(end, "end")
+    if start_d > end_d:
+        raise HTTPException(status_code=422, detail="start cannot be after end")
+    days = (end_d - start_d).days + 1
+    if days > settings.prayer_max_span_days:
+        raise HTTPException(
+            status_code=422, detail=f"Range covers {days} days; the limit is {settings.prayer_max_span_days}"
+        )
+
+    minutes = six_times_minutes(
+        np.arange(start_d.toordinal(), end_d.toordinal() + 1),
+        city.lat,
+        city.lng,
+        city.tz,
+        fajr_angle=fajr_angle,
+        maghrib_offset_min=maghrib_offset_min,
+        midnight_mode="maghrib_to_fajr",
+    )
+
+    if format == "csv":
+        return StreamingResponse(_iter_prayer_csv(start_d, minutes), media_type="text/csv")
+
+    envelope = PrayerTimesRangeResponse(
+        province_code=city.iso_3166_2,
+        city_name=city.name,
+        start=start_d.isoformat(),
+        end=end_d.isoformat(),
+        lat=city.lat,
+        lng=city.lng,
+        tz=city.tz,
+        params={
+            "fajr_angle": fajr_angle,
+            "midnight_mode": "maghrib_to_fajr",
+        },
+        days=[],
+    )
+    head = envelope.model_dump_json(exclude={"days"}).encode()[:-1]
+    return StreamingResponse(
+        _iter_prayer_json(head, start_d, minutes, hijri_offset(city.country_code)), media_type="application/json"
+    )
+
+
+@router.get("/prayer-times/{province_code}/feed.ics", response_class=StreamingResponse)
+@public  # calendar apps can't send an Authorization header
+async def get_prayer_times_feed(
+    request: Request,
+    province_code: str,
+    start: Optional[str] = Query(None, description="First local date, YYYY-MM-DD (defaults to today)"),
+    days: int = Query(settings.ics_feed_days, ge=1, le=settings.prayer_max_span_days, description="Number of days"),
+    fajr_angle: float = Query(17.7, ge=8.0, le=30.0, description="Twilight angle for Fajr"),
+    maghrib_offset_min: float = Query(4.0, ge=0.0, le=20.0, description="Minutes after sunset for Maghrib"),
+    lang: Lang = Query("en", description="Language of the event titles"),
+):
+    """
+    iCalendar feed of the six daily times, one event each, for calendar subscriptions.
+    The feed is streamed from one batched evaluation. Its ETag is derived from the request
+    alone, so a matching If-None-Match is answered with 304 without rendering anything.
+    """
+    city = await _get_province_with_coordinates(province_code)
+    tz = _province_tz(city)
+    today = datetime.now(tz=tz).date()
+    start_d = _parse_date_yyyy_mm_dd(start, "start") or today
+
+    etag = make_etag(repr(("prayer.ics", city, start_d, days, fajr_angle, maghrib_offset_min, lang)).encode())
+    headers = _max_age_headers(_province_day_end(tz, today), shared=True)
+    if etag_matches(request, etag):
+        return not_modified(etag, headers)
+
+    minutes = six_times_minutes(
+        np.arange(start_d.toordinal(), start_d.toordinal() + days),
+        city.lat,
+        city.lng,
+        city.tz,
+        fajr_angle=fajr_angle,
+        maghrib_offset_min=maghrib_offset_min,
+        midnight_mode="maghrib_to_fajr",
+    )
+    return StreamingResponse(
+        iter_calendar(city.name, iter_prayer_events(city, start_d, minutes, lang)),
+        media_type=ICS_MEDIA_TYPE,
+        headers={"ETag": etag, **headers},
+    )
+
+
+@router.get("/prayer-times/country/{country_shortcode}", response_model=CountryPrayerTimesResponse)
+async def get_prayer_times_for_country(
+    country_shortcode: str,
+    date_str: Optional[str] = Query(None, description="YYYY-MM-DD (defaults to today in the country's timezone)"),
+    fajr_angle: float = Query(17.7, ge=8.0, le=30.0, description="Twilight angle for Fajr"),
+    maghrib_offset_min: float = Query(4.0, ge=0.0, le=20.0, description="Minutes after sunset for Maghrib"),
+):
+    """
+    Prayer times on one date for every province of a country, from one coordinates query and
+    one batched evaluation. Each province's times equal /prayer-times/{province_code} for that date.
+    """
+    country = country_shortcode.upper()
+    if date_str:
+        try:
+            the_date = date.fromisoformat(date_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD.")
+    else:
+        the_date = datetime.now(zone_info(country_timezone(country))).date()
+
+    provinces, missing = country_prayer_times(
+        country,
+        the_date,
+        fajr_angle=fajr_angle,
+        maghrib_offset_min=maghrib_offset_min,
+        midnight_mode="maghrib_to_fajr",
+    )
+    if not provinces and not missing:
+        raise HTTPException(status_code=404, detail="No provinces found for this country")
+
+    return CountryPrayerTimesResponse(
+        country=country,
+        date=the_date.isoformat(),
+        hijri_date=hijri_iso(the_date.toordinal() + hijri_offset(country)),
+        params={
+            "fajr_angle": fajr_angle,
+            "midnight_mode": "maghrib_to_fajr",
+        },
+        provinces=provinces,
+        missing_coordinates=missing,
+    )
+
+
+# Compressed yearly bundles. Their URLs carry the content hash, so the bytes behind a URL never change.
+bundle_cache = ResponseCache(maxsize=settings.bundle_cache_size)
+# private: both bundle routes require authentication, so shared caches must not keep them
+BUNDLE_IMMUTABLE_HEADERS = {"Cache-Control": "private, max-age=31536000, immutable", "Vary": "Accept-Encoding"}
+BUNDLE_MANIFEST_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+async def _get_bundle(province_code: str, year: int, lang: str) -> Tuple[ProvinceEntry, CachedResponse]:
+    city = await _get_province_with_coordinates(province_code)
+    index = get_calendar_index()
+    cache_key = (city, year, lang, index.version, dimensions_version(), hijri_version())
+    cached = bundle_cache.get(cache_key)
+    if cached is None:
+        tzname = bundle_timezone(city)
+        envelope = _lunar_envelope(city.country_code or DEFAULT_COUNTRY, tzname, date(year, 1, 1), date(year, 12, 31))
+        cached = bundle_cache.put(cache_key, encode_bundle(city, year, lang, envelope))
+    return city, cached
+
+
+@router.get("/bundles/{province_code}/{year}", response_model=BundleManifest)
+async def get_bundle_manifest(
+    request: Request,
+    province_code: str,
+    year: int = Path(..., ge=1900, le=2100),
+    lang: Lang = Query("en", description="Language of the lunar calendar entries"),
+):
+    """
+    Where to download the offline bundle of a province and year: its prayer times (default
+    parameters) and its country's lunar calendar for every day. The bundle is built once
+    per worker and data version. The URL changes whenever the content does, so clients can
+    poll this cheaply (ETag) and download again only when `digest` differs.
+    """
+    city, cached = await _get_bundle(province_code, year, lang)
+    if etag_matches(request, cached.etag):
+        return not_modified(cached.etag, BUNDLE_MANIFEST_HEADERS)
+    digest = cached.etag.strip('"')
+    manifest = BundleManifest(
+        province_code=city.iso_3166_2,
+        year=year,
+        lang=lang,
+        digest=digest,
+        size=len(cached.body),
+        url=str(request.url_for("get_bundle", province_code=city.iso_3166_2, year=year, lang=lang, digest=digest)),
+    )
+    return Response(
+        content=manifest.model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": cached.etag, **BUNDLE_MANIFEST_HEADERS},
+    )
+
+
+@router.get("/bundles/{province_code}/{year}/{lang}/{digest}.json")
+async def get_bundle(
+    request: Request,
+    province_code: str,
+    lang: Lang,
+    digest: str,
+    year: int = Path(..., ge=1900, le=2100),
+):
+    """
+    The bundle itself, served precompressed (Content-Encoding: gzip) and cacheable forever.
+    A digest that no longer matches the data is a 404: fetch the manifest again.
+    """
+    _, cached = await _get_bundle(province_code, year, lang)
+    if digest != cached.etag.strip('"'):
+        raise HTTPException(status_code=404, detail="Bundle version not found; fetch the manifest again")
+    # each representation has its own validator: the identity body keeps the digest,
+    # the gzip one gets a suffix so caches never swap one for the other
+    gzipped = accepts_encoding(request, "gzip")
+    etag = f'"{digest}-gz"' if gzipped else cached.etag
+    if etag_matches(request, etag):
+        return not_modified(etag, BUNDLE_IMMUTABLE_HEADERS)
+    headers = {"ETag": etag, **BUNDLE_IMMUTABLE_HEADERS}
+    if not gzipped:
+        return Response(content=gzip.decompress(cached.body), media_type="application/json", headers=headers)
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", **headers},
     )
-    return payload
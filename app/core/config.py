@@ -21,6 +21,26 @@ class Settings(BaseSettings):
         default="http://localhost:8000/api/v1/auth/google/callback",
         alias="GOOGLE_REDIRECT_URI",
     )
+    lunar_cache_size: int = Field(1024, alias="LUNAR_CACHE_SIZE")
+    # hard cap on one /calendar/lunar range, and on the summed ranges of a batch
+    lunar_max_span_days: int = Field(3660, alias="LUNAR_MAX_SPAN_DAYS")
+    lunar_batch_max_days: int = Field(20000, alias="LUNAR_BATCH_MAX_DAYS")
+    # items per JSON page; longer ranges continue through the `next` cursor
+    lunar_page_size: int = Field(400, alias="LUNAR_PAGE_SIZE")
+    # file-backed /calendar/lunar-bc store: one file per year, `{year}` in the pattern
+    calendar_file_pattern: str = Field(
+        "app/data/calendar/astrology/lunar_calendar_baghdad_{year}.json", alias="CALENDAR_FILE_PATTERN"
+    )
+    calendar_store_max_bytes: int = Field(16 << 20, alias="CALENDAR_STORE_MAX_BYTES")
+    calendar_store_check_seconds: float = Field(2.0, alias="CALENDAR_STORE_CHECK_SECONDS")
+    # longest /prayer-times/{code}/range request, in local days
+    prayer_max_span_days: int = Field(3660, alias="PRAYER_MAX_SPAN_DAYS")
+    # serialized /prayer-times/{code} bodies kept per worker
+    prayer_cache_size: int = Field(4096, alias="PRAYER_CACHE_SIZE")
+    # default length, in local days from today, of the .ics feeds
+    ics_feed_days: int = Field(366, alias="ICS_FEED_DAYS")
+    # gzip-compressed yearly bundles kept per worker, one per (province, year, lang)
+    bundle_cache_size: int = Field(256, alias="BUNDLE_CACHE_SIZE")
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
@@ -3,7 +3,7 @@ import argparse
 import asyncio
 import json
 from dataclasses import dataclass
-from datetime import datetime, time
+from datetime import date, datetime, time
 from typing import Dict, Tuple
 
 from tortoise import Tortoise, fields
@@ -58,6 +58,7 @@ class Recommendation(Model):
 class Calendar(Model):
     id = fields.IntField(pk=True)
 
+    utc_date = fields.DateField(index=True)
     # Storing UTC components as strings, per your schema.
     utc_year = fields.CharField(max_length=4)
     utc_month = fields.CharField(max_length=2)
@@ -183,6 +184,7 @@ async def load_calendar(json_path: str, db_url: str):
 
         calendar_rows.append(
             Calendar(
+                utc_date=date(int(y), int(m), int(d)),
                 utc_year=y,
                 utc_month=m,
                 utc_day=d,
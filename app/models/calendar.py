@@ -41,9 +41,9 @@ class Recommendation(Model):
 class Calendar(Model):
     id = fields.IntField(pk=True)
 
-    # If you can, prefer a single DateField:
-    # utc_date = fields.DateField()
-    # Otherwise keep split fields (use small max_lengths):
+    # Native UTC day; range queries scan this index instead of OR-ing split fields.
+    utc_date = fields.DateField(index=True)
+    # Split fields kept for the loaders and the existing unique constraint:
     utc_year = fields.CharField(max_length=4)
     utc_month = fields.CharField(max_length=2)
     utc_day = fields.CharField(max_length=2)
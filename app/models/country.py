@@ -7,6 +7,8 @@ class Country(models.Model):
     created_at = fields.DatetimeField(auto_now_add=True)
     time_offset_minutes = fields.SmallIntField(null=True)
     timezone = fields.CharField(20, null=True)
+    # days added to a date before the tabular Hijri conversion (-1: months start a day later)
+    hijri_offset_days = fields.SmallIntField(default=0)
 
     # typing-only (helps IDEs)
     provinces: fields.ReverseRelation["Province"]
@@ -19,7 +21,7 @@ class Province(models.Model):
     id = fields.IntField(pk=True, auto=True)
     name = fields.CharField(255)
     label = fields.CharField(255)
-    iso_3166_2 = fields.CharField(10, null=True)
+    iso_3166_2 = fields.CharField(10, null=True, index=True)
     country = fields.ForeignKeyField("models.Country", related_name="provinces")
     lat = fields.FloatField(null=True)
     lng = fields.FloatField(null=True)
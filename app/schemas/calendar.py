@@ -0,0 +1,93 @@
+from datetime import date
+from typing import List, Literal, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+
+Lang = Literal["en", "ar", "fa"]
+LANGS = ("en", "ar", "fa")
+
+
+class RelatedBase(BaseModel):
+    id: int
+    en_name: str
+    ar_name: str
+    fa_name: str
+
+class RelatedLocalized(BaseModel):
+    id: int
+    name: str
+
+class CalendarItem(BaseModel):
+    id: int
+    # always include the UTC day stored in DB
+    utc_date: date = Field(..., description="UTC calendar date of the record")
+    # also expose the date as seen in the requested country's local time
+    local_date: date = Field(..., description="Local date for requested country")
+    # tabular Hijri date of local_date, with the country's offset; null outside the table
+    hijri_date: Optional[str] = Field(None, description="Hijri date (YYYY-MM-DD) of local_date")
+    moon_sign: RelatedBase
+    phase: RelatedBase
+    recommendation: RelatedBase
+
+    class Config:
+        orm_mode = True
+class LunarEnvelope(BaseModel):
+    country: str
+    timezone: str
+    start_local: date
+    end_local: date
+    start_utc: date
+    end_utc: date
+    next: Optional[str] = Field(None, description="Cursor for the following page; null on the last page")
+
+class LunarResponse(LunarEnvelope):
+    items: List[CalendarItem]
+
+class CalendarItemLocalized(BaseModel):
+    id: int
+    utc_date: date
+    local_date: date
+    hijri_date: Optional[str] = None
+    moon_sign: RelatedLocalized
+    phase: RelatedLocalized
+    recommendation: RelatedLocalized
+
+class LunarLocalizedResponse(LunarEnvelope):
+    lang: Lang
+    items: List[CalendarItemLocalized]
+
+class LunarDimensions(BaseModel):
+    moon_signs: List[Union[RelatedBase, RelatedLocalized]]
+    phases: List[Union[RelatedBase, RelatedLocalized]]
+    recommendations: List[Union[RelatedBase, RelatedLocalized]]
+
+COMPACT_FIELDS = ("id", "utc_date", "local_date", "hijri_date", "moon_sign", "phase", "recommendation")
+
+class LunarCompactResponse(LunarEnvelope):
+    lang: Optional[Lang] = None
+    # only the rows referenced by `items`
+    dimensions: LunarDimensions
+    fields: List[str] = Field(default=list(COMPACT_FIELDS), description="Column names of each item tuple")
+    items: List[Tuple[int, date, date, Optional[str], int, int, int]]
+
+class LunarBatchSpec(BaseModel):
+    country_shortcode: str = Field("IQ", min_length=2, max_length=2, description="ISO 3166-1 alpha-2 country code")
+    # local to the country; the current local month when either is omitted
+    start: Optional[date] = None
+    end: Optional[date] = None
+
+class LunarBatchRequest(BaseModel):
+    specs: List[LunarBatchSpec] = Field(..., min_length=1, max_length=100)
+    lang: Optional[Lang] = None
+
+class LunarBatchResponse(BaseModel):
+    results: List[Union[LunarResponse, LunarLocalizedResponse]]
+
+class BundleManifest(BaseModel):
+    province_code: str
+    year: int
+    lang: Lang
+    digest: str  # of the compressed bytes; part of `url`
+    size: int  # compressed bytes
+    url: str
@@ -0,0 +1,83 @@
+from datetime import date
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class Times(BaseModel):
+    fajr: str            # اذان صبح
+    sunrise: str         # طلوع آفتاب
+    dhuhr: str           # اذان ظهر
+    sunset: str          # غروب آفتاب
+    maghrib: str         # اذان مغرب
+    midnight: str        # نیمه شب
+
+
+class PrayerTimesResponse(BaseModel):
+    province_code: str
+    city_name: str
+    date: str
+    hijri_date: Optional[str] = None  # tabular, with the country's offset; null outside the table
+    lat: float
+    lng: float
+    tz: float
+    params: dict
+    times: Times
+
+
+class PrayerDay(BaseModel):
+    date: str
+    hijri_date: Optional[str] = None
+    times: Times
+
+
+class PrayerTimesRangeResponse(BaseModel):
+    province_code: str
+    city_name: str
+    start: str
+    end: str
+    lat: float
+    lng: float
+    tz: float
+    params: dict
+    days: List[PrayerDay]
+
+
+class ProvincePrayerTimes(BaseModel):
+    province_code: str
+    city_name: str
+    lat: float
+    lng: float
+    tz: float
+    times: Times
+
+
+class CountryPrayerTimesResponse(BaseModel):
+    country: str
+    date: str
+    hijri_date: Optional[str] = None
+    params: dict
+    provinces: List[ProvincePrayerTimes]
+    missing_coordinates: List[str]  # province codes without lat/lng/tz
+
+
+class NearestPrayerTimesResponse(PrayerTimesResponse):
+    distance_km: float  # from the requested point to the province's coordinates
+
+
+class Coordinates(BaseModel):
+    lat: float = Field(..., ge=-90.0, le=90.0)
+    lng: float = Field(..., ge=-180.0, le=180.0)
+
+
+class NearestPrayerTimesBatchRequest(BaseModel):
+    points: List[Coordinates] = Field(..., min_length=1, max_length=1000)
+    # the local date at each point's province; today there when omitted
+    day: Optional[date] = None
+    fajr_angle: float = Field(17.7, ge=8.0, le=30.0)
+    maghrib_offset_min: float = Field(4.0, ge=0.0, le=20.0)
+
+
+class NearestPrayerTimesBatchResponse(BaseModel):
+    params: dict
+    results: List[NearestPrayerTimesResponse]
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Compact columnar binary format for the lunar calendar data files.
+
+A `.lcal` file holds one calendar JSON file (one year of days) as:
+
+    header      struct HEADER (little-endian), 4-byte aligned
+    ordinals    int32[n_days]                 proleptic Gregorian ordinal of each day, ascending
+    columns     uint32[n_days] per TEXT_COLUMNS  string-table ids, one column after another
+    offsets     uint32[n_strings + 1]         byte offsets into the string data
+    strings     UTF-8 bytes                   every distinct text, stored once
+
+Each trilingual name and recommendation appears once in the string table,
+no matter how many days use it, and day records are fixed width. Readers
+memory-map the file read-only, so worker processes share the page cache
+instead of each building its own object graph. Texts are decoded only
+when a day is actually read.
+
+    python -m app.services.calendar_file app/data/calendar/astrology/*.json
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from datetime import date
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+MAGIC = b"LCAL"
+FORMAT_VERSION = 1
+# magic, version, reserved, year, n_days, n_strings, timezone, reference, calendar type (string ids)
+HEADER = struct.Struct("<4sHHiIIIII")
+SUFFIX = ".lcal"
+
+# (day key, language) for every text column, in the key order of the JSON files
+TEXT_COLUMNS: Tuple[Tuple[str, Optional[str]], ...] = (
+    ("moonSign", "ar"),
+    ("moonSign", "fa"),
+    ("moonSign", "en"),
+    ("phase", "ar"),
+    ("phase", "fa"),
+    ("phase", "en"),
+    ("recommendations", "ar"),
+    ("recommendations", "fa"),
+    ("recommendations", "en"),
+    ("source", None),
+)
+
+
+def _column(typecode: str, raw: Union[bytes, memoryview]) -> Union[array, memoryview]:
+    """Zero-copy typed view on little-endian hosts; a swapped copy elsewhere."""
+    if sys.byteorder == "little":
+        return memoryview(raw).cast(typecode)
+    col = array(typecode, bytes(raw))
+    col.byteswap()
+    return col
+
+
+# ----------------------------
+# Writer
+# ----------------------------
+def encode_calendar(payload: Dict[str, Any]) -> bytes:
+    """A parsed calendar JSON file (`{"year": ..., "days": [...]}`) in the binary format."""
+    strings: Dict[str, int] = {}
+
+    def sid(text: str) -> int:
+        return strings.setdefault(text, len(strings))
+
+    days = sorted(
+        (d for d in payload.get("days", []) if isinstance(d.get("date"), str)),
+        key=lambda d: d["date"],
+    )
+    ordinals = array("i", (date.fromisoformat(d["date"]).toordinal() for d in days))
+    columns = []
+    for key, lang in TEXT_COLUMNS:
+        columns.append(array("I", (sid(d[key] if lang is None else d[key][lang]) for d in days)))
+    meta = [sid(str(payload.get(k, ""))) for k in ("timezone", "localTimeReference", "calendarType")]
+
+    blobs = [s.encode("utf-8") for s in strings]
+    offsets = array("I", [0])
+    for blob in blobs:
+        offsets.append(offsets[-1] + len(blob))
+
+    parts = [HEADER.pack(MAGIC, FORMAT_VERSION, 0, int(payload.get("year", 0)), len(days), len(blobs), *meta)]
+    for col in (ordinals, *columns, offsets):
+        if sys.byteorder != "little":
+            col = array(col.typecode, col)
+            col.byteswap()
+        parts.append(col.tobytes())
+    parts.extend(blobs)
+    return b"".join(parts)
+
+
+def convert_json_file(json_path: str, out_path: Optional[str] = None) -> str:
+    """Convert one calendar JSON file; writes next to it with SUFFIX unless `out_path` is given."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        payload = json.loads(f.read().lstrip("\ufeff"))
+    out_path = out_path or os.path.splitext(json_path)[0] + SUFFIX
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(encode_calendar(payload))
+    # readers may have the old file mapped; replacing keeps their inode intact
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+# ----------------------------
+# Reader
+# ----------------------------
+class CalendarFile:
+    """
+    Read-only view of one `.lcal` file (or its bytes). Day lookups bisect
+    the ordinal column and decode only that day's strings.
+    """
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], path: Optional[str] = None):
+        self.path = path
+        self._buffer = buffer
+        magic, version, _, self.year, n_days, n_strings, *meta = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path or 'buffer'} is not a version {FORMAT_VERSION} calendar file")
+
+        view = memoryview(buffer)
+        pos = HEADER.size
+        self.ordinals = _column("i", view[pos:pos + 4 * n_days])
+        pos += 4 * n_days
+        self._columns = []
+        for _ in TEXT_COLUMNS:
+            self._columns.append(_column("I", view[pos:pos + 4 * n_days]))
+            pos += 4 * n_days
+        self._offsets = _column("I", view[pos:pos + 4 * (n_strings + 1)])
+        pos += 4 * (n_strings + 1)
+        self._strings = view[pos:]
+        self._decoded: Dict[int, str] = {}
+        self.timezone, self.local_time_reference, self.calendar_type = (self.string(i) for i in meta)
+
+    @classmethod
+    def open(cls, path: str) -> "CalendarFile":
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path)
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def min_date(self) -> Optional[date]:
+        return date.fromordinal(self.ordinals[0]) if len(self) else None
+
+    @property
+    def max_date(self) -> Optional[date]:
+        return date.fromordinal(self.ordinals[-1]) if len(self) else None
+
+    def string(self, sid: int) -> str:
+        text = self._decoded.get(sid)
+        if text is None:
+            text = self._decoded[sid] = str(self._strings[self._offsets[sid]:self._offsets[sid + 1]], "utf-8")
+        return text
+
+    def find(self, d: date) -> Optional[int]:
+        ordinal = d.toordinal()
+        pos = bisect_left(self.ordinals, ordinal)
+        return pos if pos < len(self) and self.ordinals[pos] == ordinal else None
+
+    def day(self, pos: int) -> Dict[str, Any]:
+        """Day `pos` shaped exactly like its entry in the source JSON file."""
+        out: Dict[str, Any] = {"date": date.fromordinal(self.ordinals[pos]).isoformat()}
+        for (key, lang), col in zip(TEXT_COLUMNS, self._columns):
+            if lang is None:
+                out[key] = self.string(col[pos])
+            else:
+                out.setdefault(key, {})[lang] = self.string(col[pos])
+        return out
+
+    def get(self, d: date) -> Optional[Dict[str, Any]]:
+        pos = self.find(d)
+        return None if pos is None else self.day(pos)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.day(pos) for pos in range(len(self)))
+
+    def close(self) -> None:
+        # drop views first; mmap.close() refuses while buffers are exported
+        self.ordinals = self._offsets = self._strings = None
+        self._columns = []
+        if isinstance(self._buffer, mmap.mmap):
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass  # a caller still holds a view; the mapping goes with it
+
+
+def open_calendar(json_path: str) -> CalendarFile:
+    """
+    The calendar for a configured JSON path: memory-maps the sibling `.lcal`
+    when it is at least as new as the JSON (or the JSON is absent), otherwise
+    converts in memory.
+    """
+    bin_path = os.path.splitext(json_path)[0] + SUFFIX
+    try:
+        bin_mtime = os.path.getmtime(bin_path)
+    except OSError:
+        bin_mtime = None
+    if bin_mtime is not None and (not os.path.exists(json_path) or bin_mtime >= os.path.getmtime(json_path)):
+        return CalendarFile.open(bin_path)
+    with open(json_path, "r", encoding="utf-8") as f:
+        raw = f.read().lstrip("\ufeff").strip()
+    try:
+        payload = json.loads(raw)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Failed to parse JSON in {json_path}: {e}") from e
+    return CalendarFile(encode_calendar(payload), json_path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Convert lunar calendar JSON files to the .lcal binary format.")
+    parser.add_argument("json_files", nargs="+")
+    args = parser.parse_args(argv)
+    for path in args.json_files:
+        out = convert_json_file(path)
+        print(f"{path} ({os.path.getsize(path)} bytes) -> {out} ({os.path.getsize(out)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""In-process, read-only index over the `calendars` table.
+
+The lunar endpoints are read-only in practice, so the whole table (a few
+hundred rows per year) is loaded once into parallel arrays sorted by UTC day
+ordinal and sliced with `bisect`. Related rows are resolved by id through
+`app.services.dimensions`. A reload builds a brand-new snapshot and
+swaps it in with a single assignment, so readers never see a half-built index.
+
+Each worker holds its own snapshot: after the loader writes new rows, call
+`reload_calendar_index()` (or `POST /calendar/lunar/reload`) on every worker.
+`version` is local to the process; `digest` hashes the indexed content, so
+workers (and restarts) holding the same rows agree on it.
+"""
+
+import hashlib
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date
+from itertools import count
+from typing import Optional, Tuple
+
+from app.models.calendar import Calendar
+
+_versions = count(1)
+
+
+@dataclass(frozen=True)
+class CalendarIndex:
+    version: int
+    digest: str
+    # sorted UTC day ordinals (date.toordinal()) plus parallel id columns
+    ordinals: array
+    ids: array
+    moon_sign_ids: array
+    phase_ids: array
+    recommendation_ids: array
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def span(self, start_utc: date, end_utc: date) -> range:
+        """Positions of the rows whose UTC day falls in [start_utc .. end_utc]."""
+        lo = bisect_left(self.ordinals, start_utc.toordinal())
+        hi = bisect_right(self.ordinals, end_utc.toordinal())
+        return range(lo, hi)
+
+    def page(
+        self, start_utc: date, end_utc: date, after_ordinal: Optional[int] = None, limit: Optional[int] = None
+    ) -> Tuple[range, Optional[int]]:
+        """
+        Keyset page of `span(start_utc, end_utc)`: at most `limit` rows whose UTC
+        ordinal is greater than `after_ordinal`, plus the ordinal to continue
+        after (None on the last page).
+        """
+        span = self.span(start_utc, end_utc)
+        lo = span.start
+        if after_ordinal is not None:
+            lo = bisect_right(self.ordinals, after_ordinal, span.start, span.stop)
+        if limit is None or span.stop - lo <= limit:
+            return range(lo, span.stop), None
+        return range(lo, lo + limit), self.ordinals[lo + limit - 1]
+
+    def utc_date(self, pos: int) -> date:
+        return date.fromordinal(self.ordinals[pos])
+
+    @property
+    def min_date(self) -> Optional[date]:
+        return self.utc_date(0) if self.ordinals else None
+
+    @property
+    def max_date(self) -> Optional[date]:
+        return self.utc_date(-1) if self.ordinals else None
+
+
+async def build_calendar_index() -> CalendarIndex:
+    """Read the calendar table into a fresh snapshot."""
+    rows = await Calendar.all().order_by("utc_date").values_list(
+        "utc_date", "id", "moon_sign_id", "phase_id", "recommendation_id"
+    )
+    columns = [array("l") for _ in range(5)]
+    for row in rows:
+        columns[0].append(row[0].toordinal())
+        for column, value in zip(columns[1:], row[1:]):
+            column.append(value)
+    ordinals, ids, moon_sign_ids, phase_ids, recommendation_ids = columns
+    digest = hashlib.sha256()
+    for column in (ordinals, moon_sign_ids, phase_ids, recommendation_ids):
+        digest.update(column.tobytes())
+    return CalendarIndex(
+        version=next(_versions),
+        digest=digest.hexdigest(),
+        ordinals=ordinals,
+        ids=ids,
+        moon_sign_ids=moon_sign_ids,
+        phase_ids=phase_ids,
+        recommendation_ids=recommendation_ids,
+    )
+
+
+_index: Optional[CalendarIndex] = None
+
+
+def get_calendar_index() -> CalendarIndex:
+    if _index is None:
+        raise RuntimeError("Calendar index is not loaded; call reload_calendar_index() at startup.")
+    return _index
+
+
+async def reload_calendar_index() -> CalendarIndex:
+    """Rebuild the index from the database and swap it in atomically."""
+    global _index
+    _index = await build_calendar_index()
+    return _index
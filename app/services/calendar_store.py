@@ -0,0 +1,148 @@
+"""Lazy, per-year, hot-reloadable store over the calendar data files.
+
+Years are opened on first access (see `app.services.calendar_file`), kept
+in LRU order, and evicted once the loaded files exceed the byte budget.
+Each year's source files are re-stat'ed at most once per check interval;
+a changed inode, mtime or size loads the new file and swaps it in with a
+single dict assignment, so a reader either sees the old year or the new
+one, never a mix. Dropping a file in place (or deleting one) takes effect
+without a restart.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.services.calendar_file import SUFFIX, CalendarFile, open_calendar
+
+# (inode, mtime_ns, size) of the JSON and .lcal sources; None where absent
+Signature = Tuple[Optional[Tuple[int, int, int]], Optional[Tuple[int, int, int]]]
+
+
+def _stat(path: str) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+@dataclass
+class _Year:
+    calendar: CalendarFile
+    signature: Signature
+    checked_at: float
+
+
+class CalendarStore:
+    """
+    Day lookups over per-year calendar files.
+
+    `pattern` names a year's JSON file with a `{year}` placeholder; `overrides`
+    pins specific years to other paths. A `.lcal` sibling is preferred when
+    it is up to date.
+    """
+
+    def __init__(
+        self,
+        pattern: str,
+        overrides: Optional[Dict[int, str]] = None,
+        max_bytes: int = 16 << 20,
+        check_interval: float = 2.0,
+    ):
+        self.pattern = pattern
+        self.overrides = dict(overrides or {})
+        self.max_bytes = max_bytes
+        self.check_interval = check_interval
+        self._years: "OrderedDict[int, _Year]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def path_for(self, year: int) -> str:
+        path = self.overrides.get(year) or self.pattern.format(year=year)
+        if not path.endswith(".json") and not os.path.exists(path):
+            path += ".json"
+        return path
+
+    def _signature(self, year: int) -> Signature:
+        json_path = self.path_for(year)
+        return _stat(json_path), _stat(os.path.splitext(json_path)[0] + SUFFIX)
+
+    def year(self, year: int) -> Optional[CalendarFile]:
+        """The calendar for `year`, loading or reloading it if needed; None when no file exists."""
+        now = time.monotonic()
+        entry = self._years.get(year)
+        if entry is not None and now - entry.checked_at < self.check_interval:
+            with self._lock:
+                if year in self._years:
+                    self._years.move_to_end(year)
+            return entry.calendar
+
+        signature = self._signature(year)
+        if signature == (None, None):
+            with self._lock:
+                self._years.pop(year, None)
+            return None
+        if entry is not None and entry.signature == signature:
+            entry.checked_at = now
+            with self._lock:
+                if year in self._years:
+                    self._years.move_to_end(year)
+            return entry.calendar
+
+        # load outside the lock; a concurrent loader of the same year just wins the race
+        try:
+            calendar = open_calendar(self.path_for(year))
+        except (OSError, RuntimeError, ValueError):
+            if entry is None:
+                raise
+            # half-written replacement: keep serving the last good file and retry later
+            entry.checked_at = now
+            return entry.calendar
+        with self._lock:
+            self._years[year] = _Year(calendar, signature, now)
+            self._years.move_to_end(year)
+            self.loads += 1
+            self._evict(keep=year)
+        return calendar
+
+    def _evict(self, keep: int) -> None:
+        while self.loaded_bytes > self.max_bytes and len(self._years) > 1:
+            year = next(iter(self._years))
+            if year == keep:
+                self._years.move_to_end(year)
+                continue
+            # in-flight readers keep their reference; the mapping is freed with the last one
+            del self._years[year]
+            self.evictions += 1
+
+    @property
+    def loaded_bytes(self) -> int:
+        return sum(entry.calendar.nbytes for entry in list(self._years.values()))
+
+    def get(self, d: date) -> Optional[Dict[str, Any]]:
+        calendar = self.year(d.year)
+        return None if calendar is None else calendar.get(d)
+
+    def iter_days(self, start: date, end: date) -> Iterator[Tuple[date, Optional[Dict[str, Any]]]]:
+        """(date, day or None) for every date in [start .. end], one year lookup per year."""
+        year, calendar = None, None
+        for ordinal in range(start.toordinal(), end.toordinal() + 1):
+            d = date.fromordinal(ordinal)
+            if d.year != year:
+                year, calendar = d.year, self.year(d.year)
+            yield d, None if calendar is None else calendar.get(d)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loaded_years": sorted(self._years),
+            "loaded_bytes": self.loaded_bytes,
+            "max_bytes": self.max_bytes,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,93 @@
+"""Country code -> IANA zone, resolved once instead of per request.
+
+The map is seeded from the `countries` table: a country's `timezone` column
+wins; without one, a whole-hour `time_offset_minutes` maps to the matching
+fixed `Etc/GMT±N` zone. Codes missing from the table (or with unusable values)
+fall back to pytz's country list, memoized. Saves and deletes of `Country`
+rebuild the map through Tortoise signals; the new dict replaces the old one
+in a single assignment, so readers never see a partial map.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+import pytz
+from tortoise.signals import post_delete, post_save
+
+from app.models.country import Country
+from app.services.timezones import zone_info
+
+DEFAULT_COUNTRY = "IQ"
+
+_zones: Dict[str, str] = {}
+
+
+@lru_cache(maxsize=None)
+def _pytz_zone(cc: str) -> str:
+    """First non-Etc zone pytz lists for the country, else UTC."""
+    try:
+        zones = pytz.country_timezones(cc)
+    except KeyError:
+        return "UTC"
+    for z in zones:
+        if not z.startswith("Etc/"):
+            return z
+    return zones[0] if zones else "UTC"
+
+
+def _offset_zone(minutes: Optional[int]) -> Optional[str]:
+    if minutes is None or minutes % 60:
+        return None
+    hours = minutes // 60
+    # Etc/ zones use POSIX signs: UTC+3 is Etc/GMT-3
+    return "Etc/UTC" if hours == 0 else f"Etc/GMT{-hours:+d}"
+
+
+def _usable(tzname: Optional[str]) -> bool:
+    if not tzname:
+        return False
+    try:
+        zone_info(tzname)
+        pytz.timezone(tzname)
+    except Exception:
+        return False
+    return True
+
+
+def country_timezone(country_shortcode: Optional[str]) -> str:
+    """IANA zone name for a 2-letter country code (DEFAULT_COUNTRY when empty)."""
+    cc = (country_shortcode or DEFAULT_COUNTRY).upper()
+    tzname = _zones.get(cc)
+    return tzname if tzname is not None else _pytz_zone(cc)
+
+
+def country_zones() -> Dict[str, str]:
+    """The current DB-seeded map (without the pytz fallbacks)."""
+    return dict(_zones)
+
+
+async def load_country_zones() -> Dict[str, str]:
+    global _zones
+    zones: Dict[str, str] = {}
+    rows = await Country.filter(iso_alpha2__isnull=False).values_list("iso_alpha2", "timezone", "time_offset_minutes")
+    for code, tzname, offset in rows:
+        cc = code.strip().upper()
+        if not cc:
+            continue
+        for candidate in (tzname and tzname.strip(), _offset_zone(offset)):
+            if _usable(candidate):
+                zones[cc] = candidate
+                break
+    _zones = zones
+    return zones
+
+
+@post_save(Country)
+async def _on_country_saved(sender, instance, created, using_db, update_fields) -> None:
+    # the old code of a renamed country isn't on the instance, so rebuild (the table is small)
+    await load_country_zones()
+
+
+@post_delete(Country)
+async def _on_country_deleted(sender, instance, using_db) -> None:
+    await load_country_zones()
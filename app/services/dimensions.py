@@ -0,0 +1,105 @@
+"""Interned dimension tables for the lunar calendar.
+
+MoonSign, Phase and Recommendation are tiny and almost never change, so each
+table is loaded once into a dict of shared `RelatedBase` objects (and their
+pre-encoded JSON) keyed by id. Responses reference those instead of
+re-fetching and rebuilding them per row. Saves and deletes through the ORM
+update the affected entry via Tortoise signals; bulk writes that bypass
+signals need `load_dimensions()`. `version` is per process; `digest` hashes
+the rows themselves and is the same in every worker holding the same data.
+"""
+
+import hashlib
+from itertools import count
+from typing import Dict, Optional, Tuple, Type
+
+from tortoise.models import Model
+from tortoise.signals import post_delete, post_save
+
+from app.models.calendar import MoonSign, Phase, Recommendation
+from app.schemas.calendar import LANGS, RelatedBase, RelatedLocalized
+
+
+_versions = count(1)
+
+
+class DimensionTable:
+    def __init__(self, model: Type[Model]):
+        self.model = model
+        self.version = 0  # bumped on every change, for response caches
+        self.digest = ""  # sha256 of the rows, stable across processes
+        self._items: Dict[int, RelatedBase] = {}
+        # lang -> id -> JSON; lang None is the trilingual RelatedBase shape
+        self._fragments: Dict[Optional[str], Dict[int, bytes]] = {}
+
+    def __getitem__(self, pk: int) -> RelatedBase:
+        return self._items[pk]
+
+    def fragment(self, pk: int, lang: Optional[str] = None) -> bytes:
+        """The row pre-encoded as JSON (RelatedBase, or RelatedLocalized for `lang`)."""
+        return self._fragments[lang][pk]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @staticmethod
+    def _intern(row) -> RelatedBase:
+        return RelatedBase(id=row.id, en_name=row.en_name, ar_name=row.ar_name, fa_name=row.fa_name)
+
+    def _swap(self, items: Dict[int, RelatedBase]) -> None:
+        fragments = {None: {pk: item.model_dump_json().encode() for pk, item in items.items()}}
+        for lang in LANGS:
+            fragments[lang] = {
+                pk: RelatedLocalized(id=pk, name=getattr(item, f"{lang}_name")).model_dump_json().encode()
+                for pk, item in items.items()
+            }
+        self._fragments = fragments
+        self._items = items
+        self.digest = hashlib.sha256(b"\n".join(fragments[None][pk] for pk in sorted(items))).hexdigest()
+        self.version = next(_versions)
+
+    async def load(self) -> None:
+        # build the new dicts first, then swap them in
+        self._swap({row.id: self._intern(row) for row in await self.model.all()})
+
+    def put(self, row) -> None:
+        self._swap({**self._items, row.id: self._intern(row)})
+
+    def discard(self, pk: int) -> None:
+        if pk in self._items:
+            self._swap({k: v for k, v in self._items.items() if k != pk})
+
+
+moon_signs = DimensionTable(MoonSign)
+phases = DimensionTable(Phase)
+recommendations = DimensionTable(Recommendation)
+
+_TABLES: Dict[Type[Model], DimensionTable] = {
+    MoonSign: moon_signs,
+    Phase: phases,
+    Recommendation: recommendations,
+}
+
+
+def dimensions_version() -> Tuple[int, ...]:
+    return tuple(table.version for table in _TABLES.values())
+
+
+def dimensions_digest() -> str:
+    """Content hash of all three tables, for validators shared across workers."""
+    return hashlib.sha256("".join(table.digest for table in _TABLES.values()).encode()).hexdigest()
+
+
+async def load_dimensions() -> None:
+    for table in _TABLES.values():
+        await table.load()
+
+
+@post_save(MoonSign, Phase, Recommendation)
+async def _on_dimension_saved(sender, instance, created, using_db, update_fields) -> None:
+    _TABLES[sender].put(instance)
+
+
+@post_delete(MoonSign, Phase, Recommendation)
+async def _on_dimension_deleted(sender, instance, using_db) -> None:
+    _TABLES[sender].discard(instance.pk)
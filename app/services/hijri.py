@@ -0,0 +1,108 @@
+"""Table-driven Hijri dates (tabular Islamic calendar), with per-country offsets.
+
+The arithmetical calendar (30-year cycle, leap years 2, 5, 7, 10, 13, 16, 18,
+21, 24, 26, 29; epoch 1 Muharram 1 AH = 16 July 622 Julian) fixes the first
+day of every month. Those day ordinals are computed once for AH 1300..1599
+(late 1882 to late 2173 CE), so a date converts with one bisect and a whole
+range with one `searchsorted`. Dates outside the table convert to None.
+
+Where the observed month starts differ from the tabular ones, a country's
+`hijri_offset_days` shifts the date before the lookup: -1 makes every month
+begin one day later. Offsets load at startup and reload on Country saves
+and deletes through Tortoise signals.
+"""
+
+from bisect import bisect_right
+from datetime import date
+from functools import lru_cache
+from itertools import count
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from tortoise.signals import post_delete, post_save
+
+from app.models.country import Country
+
+FIRST_YEAR, LAST_YEAR = 1300, 1599
+_EPOCH = date(622, 7, 19).toordinal()  # 16 July 622 Julian, in proleptic Gregorian ordinals
+
+
+def month_start(year: int, month: int) -> int:
+    """Day ordinal of the 1st of a Hijri month."""
+    return _EPOCH + (year - 1) * 354 + (3 + 11 * year) // 30 + (59 * (month - 1) + 1) // 2
+
+
+# 12 months per year plus the end of the last one; MONTH_STARTS[i] begins month i % 12 + 1
+# of year FIRST_YEAR + i // 12
+MONTH_STARTS = np.array(
+    [month_start(y, m) for y in range(FIRST_YEAR, LAST_YEAR + 1) for m in range(1, 13)]
+    + [month_start(LAST_YEAR + 1, 1)],
+    dtype=np.int64,
+)
+_MONTH_STARTS = MONTH_STARTS.tolist()
+
+
+def to_hijri(ordinal: int) -> Optional[Tuple[int, int, int]]:
+    """(year, month, day) for a day ordinal, or None outside the table."""
+    i = bisect_right(_MONTH_STARTS, ordinal) - 1
+    if i < 0 or i >= len(_MONTH_STARTS) - 1:
+        return None
+    return FIRST_YEAR + i // 12, i % 12 + 1, ordinal - _MONTH_STARTS[i] + 1
+
+
+@lru_cache(maxsize=1 << 16)
+def hijri_iso(ordinal: int) -> Optional[str]:
+    """'YYYY-MM-DD' Hijri date for a day ordinal (offset already applied)."""
+    ymd = to_hijri(ordinal)
+    return "%04d-%02d-%02d" % ymd if ymd else None
+
+
+def hijri_isos(ordinals: Sequence[int]) -> List[Optional[str]]:
+    """`hijri_iso` for many ordinals (offset already applied) in one pass."""
+    o = np.asarray(ordinals, dtype=np.int64)
+    i = np.searchsorted(MONTH_STARTS, o, side="right") - 1
+    valid = (i >= 0) & (i < len(MONTH_STARTS) - 1)
+    i = np.where(valid, i, 0)
+    days = (o - MONTH_STARTS[i] + 1).tolist()
+    return [
+        "%04d-%02d-%02d" % (FIRST_YEAR + k // 12, k % 12 + 1, d) if ok else None
+        for k, d, ok in zip(i.tolist(), days, valid.tolist())
+    ]
+
+
+# ---------------------------
+# Per-country offsets
+# ---------------------------
+_versions = count(1)
+_offsets: Dict[str, int] = {}
+_version = 0
+
+
+def hijri_offset(country_shortcode: Optional[str]) -> int:
+    """Days added to a date before conversion for the country (0 when unset)."""
+    return _offsets.get((country_shortcode or "").upper(), 0)
+
+
+def hijri_version() -> int:
+    """Bumped whenever the offsets reload, for response caches."""
+    return _version
+
+
+async def load_hijri_offsets() -> Dict[str, int]:
+    global _offsets, _version
+    rows = await Country.filter(iso_alpha2__isnull=False).exclude(hijri_offset_days=0).values_list(
+        "iso_alpha2", "hijri_offset_days"
+    )
+    _offsets = {code.strip().upper(): offset for code, offset in rows if code.strip()}
+    _version = next(_versions)
+    return _offsets
+
+
+@post_save(Country)
+async def _on_country_saved(sender, instance, created, using_db, update_fields) -> None:
+    await load_hijri_offsets()
+
+
+@post_delete(Country)
+async def _on_country_deleted(sender, instance, using_db) -> None:
+    await load_hijri_offsets()
@@ -0,0 +1,164 @@
+"""Streaming iCalendar (RFC 5545) feeds for prayer times and the lunar calendar.
+
+Feeds are produced by generators: the prayer times of a whole range come
+from one batched kernel call, and VEVENTs are then formatted and yielded a
+chunk of days at a time, so memory stays flat however long the range is.
+Output is a pure function of the inputs (DTSTAMP included), which lets the
+endpoints derive ETags from the request alone, without rendering.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from app.services.calendar_index import CalendarIndex
+from app.services.dimensions import moon_signs, phases, recommendations
+from app.services.prayer_times import EVENTS
+from app.services.province_registry import ProvinceEntry
+
+ICS_MEDIA_TYPE = "text/calendar; charset=utf-8"
+PRODID = "-//Lunar Calendar API//Feeds//EN"
+
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+EVENT_NAMES: Dict[str, Dict[str, str]] = {
+    "en": {
+        "fajr": "Fajr",
+        "sunrise": "Sunrise",
+        "dhuhr": "Dhuhr",
+        "sunset": "Sunset",
+        "maghrib": "Maghrib",
+        "midnight": "Midnight",
+    },
+    "ar": {
+        "fajr": "الفجر",
+        "sunrise": "الشروق",
+        "dhuhr": "الظهر",
+        "sunset": "الغروب",
+        "maghrib": "المغرب",
+        "midnight": "منتصف الليل",
+    },
+    "fa": {
+        "fajr": "اذان صبح",
+        "sunrise": "طلوع آفتاب",
+        "dhuhr": "اذان ظهر",
+        "sunset": "غروب آفتاب",
+        "maghrib": "اذان مغرب",
+        "midnight": "نیمه شب",
+    },
+}
+
+
+def escape_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def content_line(line: str) -> bytes:
+    """One content line, folded at 75 octets without splitting a UTF-8 sequence."""
+    raw = line.encode()
+    if len(raw) <= 75:
+        return raw + b"\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and (raw[end] & 0xC0) == 0x80:  # continuation byte
+            end -= 1
+        parts.append(raw[start:end])
+        start, limit = end, 74  # continuation lines start with a space
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def _utc_stamp(epoch_seconds: int) -> str:
+    return datetime.fromtimestamp(epoch_seconds, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def iter_calendar(name: str, events: Iterable[bytes]) -> Iterator[bytes]:
+    """VCALENDAR envelope around already-encoded VEVENT chunks."""
+    yield b"".join(
+        content_line(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{escape_text(name)}",
+        )
+    )
+    yield from events
+    yield content_line("END:VCALENDAR")
+
+
+def iter_prayer_events(
+    city: ProvinceEntry,
+    first: date,
+    minutes: Dict[str, np.ndarray],
+    lang: str = "en",
+    chunk_days: int = 31,
+) -> Iterator[bytes]:
+    """
+    One VEVENT per event per day of `six_times_minutes` output (a single
+    location, days from `first`), at UTC instants, a chunk of days per yield.
+    """
+    names = EVENT_NAMES[lang]
+    offset_seconds = round(city.tz * 3600)
+    dtstamp = _utc_stamp((first.toordinal() - _UNIX_EPOCH_ORDINAL) * 86400)
+    total = len(minutes["fajr"])
+    for lo in range(0, total, chunk_days):
+        hi = min(lo + chunk_days, total)
+        columns = [minutes[event][lo:hi].tolist() for event in EVENTS]
+        lines = []
+        for i in range(hi - lo):
+            day = first.toordinal() + lo + i
+            midnight_utc = (day - _UNIX_EPOCH_ORDINAL) * 86400 - offset_seconds
+            iso = date.fromordinal(day).isoformat()
+            for event, column in zip(EVENTS, columns):
+                lines += (
+                    "BEGIN:VEVENT",
+                    f"UID:{iso}-{event}-{city.iso_3166_2}@prayer-times",
+                    f"DTSTAMP:{dtstamp}",
+                    f"DTSTART:{_utc_stamp(midnight_utc + column[i] * 60)}",
+                    f"SUMMARY:{escape_text(names[event])} ({escape_text(city.name)})",
+                    "TRANSP:TRANSPARENT",
+                    "END:VEVENT",
+                )
+        yield b"".join(content_line(line) for line in lines)
+
+
+def _name(row, lang: Optional[str]) -> str:
+    return getattr(row, f"{lang or 'en'}_name")
+
+
+def iter_lunar_events(
+    country: str,
+    index: CalendarIndex,
+    span: range,
+    local_ordinals: Sequence[int],
+    lang: Optional[str] = None,
+    chunk_days: int = 31,
+) -> Iterator[bytes]:
+    """
+    One all-day VEVENT per calendar row in `span` (on its local date): moon
+    sign and phase as the summary, the recommendation as the description.
+    """
+    dtstamp = _utc_stamp((index.ordinals[span.start] - _UNIX_EPOCH_ORDINAL) * 86400) if span else ""
+    for lo in range(span.start, span.stop, chunk_days):
+        hi = min(lo + chunk_days, span.stop)
+        lines = []
+        for pos in range(lo, hi):
+            local_day = date.fromordinal(local_ordinals[pos - span.start])
+            sign = _name(moon_signs[index.moon_sign_ids[pos]], lang)
+            phase = _name(phases[index.phase_ids[pos]], lang)
+            advice = _name(recommendations[index.recommendation_ids[pos]], lang)
+            lines += (
+                "BEGIN:VEVENT",
+                f"UID:{index.utc_date(pos).isoformat()}-{country}@lunar-calendar",
+                f"DTSTAMP:{dtstamp}",
+                f"DTSTART;VALUE=DATE:{local_day.strftime('%Y%m%d')}",
+                f"SUMMARY:{escape_text(sign)} · {escape_text(phase)}",
+                f"DESCRIPTION:{escape_text(advice)}",
+                "TRANSP:TRANSPARENT",
+                "END:VEVENT",
+            )
+        yield b"".join(content_line(line) for line in lines)
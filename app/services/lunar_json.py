@@ -0,0 +1,226 @@
+"""Byte-level JSON encoding for lunar calendar responses.
+
+Calendar days are immutable once loaded, so each day's item is encoded once
+as fragments around its only per-request fields, `local_date` and
+`hijri_date` (which follows the local date and the country's offset):
+
+    {"id":1,"utc_date":"2025-01-01","local_date":"<local>","hijri_date":<hijri>,"moon_sign":{...},...}
+    `------------------- head -------------------'       `---- mid ----'       `------- tail --------'
+
+Responses are assembled by splicing fragments, which skips building and
+validating a response model per request. The output is byte-for-byte what
+`model_dump_json()` of the matching schema in `app.schemas.calendar` would
+produce. Fragments exist per variant: the full trilingual item, one per
+language (`lang=`), and the compact id tuple.
+"""
+
+import binascii
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass
+from datetime import date
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.schemas.calendar import COMPACT_FIELDS, LunarEnvelope
+from app.services.calendar_index import CalendarIndex, get_calendar_index
+from app.services.dimensions import dimensions_version, moon_signs, phases, recommendations
+from app.services.hijri import hijri_iso, hijri_offset
+from app.services.timezones import zone_projection
+
+COMPACT = "compact"
+_RELATIONS = (
+    ("moon_sign", "moon_signs", moon_signs),
+    ("phase", "phases", phases),
+    ("recommendation", "recommendations", recommendations),
+)
+
+
+@dataclass(frozen=True)
+class DayFragments:
+    key: Tuple  # (index version, dimension versions) the fragments were built from
+    heads: List[bytes]
+    mid: bytes  # between the local date and the Hijri date
+    tails: List[bytes]
+
+
+# variant (None = full item, a language code, or COMPACT) -> fragments
+_fragments: Dict[Optional[str], DayFragments] = {}
+
+
+def _relation_ids(index: CalendarIndex, pos: int) -> Tuple[int, int, int]:
+    return index.moon_sign_ids[pos], index.phase_ids[pos], index.recommendation_ids[pos]
+
+
+def day_fragments(index: CalendarIndex, variant: Optional[str] = None) -> DayFragments:
+    """Pre-encoded item fragments for every day in `index`, rebuilt when the data changes."""
+    key = (index.version, dimensions_version())
+    fragments = _fragments.get(variant)
+    if fragments is not None and fragments.key == key:
+        return fragments
+
+    heads: List[bytes] = []
+    tails: List[bytes] = []
+    for pos in range(len(index)):
+        row_id, utc_iso = index.ids[pos], index.utc_date(pos).isoformat().encode()
+        if variant == COMPACT:
+            heads.append(b'[%d,"%s","' % (row_id, utc_iso))
+            tails.append(b",%d,%d,%d]" % _relation_ids(index, pos))
+            continue
+        heads.append(b'{"id":%d,"utc_date":"%s","local_date":"' % (row_id, utc_iso))
+        tail = b""
+        for (name, _, table), pk in zip(_RELATIONS, _relation_ids(index, pos)):
+            tail += b',"%s":%s' % (name.encode(), table.fragment(pk, variant))
+        tails.append(tail + b"}")
+    mid = b'",' if variant == COMPACT else b'","hijri_date":'
+    fragments = _fragments[variant] = DayFragments(key=key, heads=heads, mid=mid, tails=tails)
+    return fragments
+
+
+@lru_cache(maxsize=1 << 16)
+def _iso(ordinal: int) -> bytes:
+    return date.fromordinal(ordinal).isoformat().encode()
+
+
+@lru_cache(maxsize=1 << 16)
+def _hijri_json(ordinal: int) -> bytes:
+    hijri = hijri_iso(ordinal)
+    return b'"%s"' % hijri.encode() if hijri else b"null"
+
+
+def iter_items(
+    fragments: DayFragments, lo: int, hi: int, local_ordinals: Sequence[int], hijri_offset_days: int = 0
+) -> Iterator[bytes]:
+    """Encoded items for index positions [lo, hi), given their local day ordinals."""
+    heads, mid, tails = fragments.heads, fragments.mid, fragments.tails
+    for pos, local_ordinal in zip(range(lo, hi), local_ordinals):
+        yield heads[pos] + _iso(local_ordinal) + mid + _hijri_json(local_ordinal + hijri_offset_days) + tails[pos]
+
+
+def _project(index: CalendarIndex, tzname: str, lo: int, hi: int) -> Sequence[int]:
+    return zone_projection(tzname).project(index.ordinals, lo, hi)
+
+
+def _encode_envelope(envelope: LunarEnvelope, lang: Optional[str]) -> bytes:
+    """Envelope object without its closing brace, plus `lang` when projecting."""
+    head = envelope.model_dump_json().encode()[:-1]
+    if lang is not None:
+        head += b',"lang":"%s"' % lang.encode()
+    return head
+
+
+def _encode_dimensions(index: CalendarIndex, span: range, lang: Optional[str]) -> bytes:
+    """Only the dimension rows referenced in `span`, each listed once."""
+    parts = []
+    for (_, plural, table), ids in zip(
+        _RELATIONS, (index.moon_sign_ids, index.phase_ids, index.recommendation_ids)
+    ):
+        used = sorted(set(ids[span.start:span.stop]))
+        parts.append(b'"%s":[%s]' % (plural.encode(), b",".join(table.fragment(pk, lang) for pk in used)))
+    return b'"dimensions":{' + b",".join(parts) + b"}"
+
+
+def encode_cursor(after_ordinal: int) -> str:
+    return urlsafe_b64encode(b"u%d" % after_ordinal).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> int:
+    """UTC day ordinal a `next` cursor continues after; ValueError if malformed."""
+    try:
+        raw = urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (binascii.Error, ValueError):
+        raise ValueError("malformed cursor")
+    if not raw.startswith(b"u") or not raw[1:].isdigit():
+        raise ValueError("malformed cursor")
+    return int(raw[1:])
+
+
+def encode_lunar_response(
+    envelope: LunarEnvelope,
+    lang: Optional[str] = None,
+    compact: bool = False,
+    after_ordinal: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> bytes:
+    """
+    One page of the response body for `envelope`, spliced from day fragments:
+    LunarResponse, LunarLocalizedResponse (`lang`) or LunarCompactResponse (`compact`).
+    Pages are keyset on the UTC day; `next` is set when more rows remain.
+    """
+    index = get_calendar_index()
+    span, next_after = index.page(envelope.start_utc, envelope.end_utc, after_ordinal, limit)
+    if next_after is not None:
+        envelope = envelope.model_copy(update={"next": encode_cursor(next_after)})
+    if compact:
+        fragments = day_fragments(index, COMPACT)
+        # LunarCompactResponse always carries `lang`, null for trilingual dimensions
+        lang_json = b'"%s"' % lang.encode() if lang else b"null"
+        fields_json = b",".join(b'"%s"' % f.encode() for f in COMPACT_FIELDS)
+        head = b'%s,"lang":%s,%s,"fields":[%s]' % (
+            _encode_envelope(envelope, None),
+            lang_json,
+            _encode_dimensions(index, span, lang),
+            fields_json,
+        )
+    else:
+        fragments = day_fragments(index, lang)
+        head = _encode_envelope(envelope, lang)
+    return b"".join(
+        (
+            head,
+            b',"items":[',
+            b",".join(
+                iter_items(
+                    fragments,
+                    span.start,
+                    span.stop,
+                    _project(index, envelope.timezone, span.start, span.stop),
+                    hijri_offset(envelope.country),
+                )
+            ),
+            b"]}",
+        )
+    )
+
+
+def iter_lunar_ndjson(envelope: LunarEnvelope, lang: Optional[str] = None, chunk_days: int = 366) -> Iterator[bytes]:
+    """
+    Envelope line first, then one item per line, produced a chunk of days at
+    a time so memory stays flat however long the range is.
+    """
+    yield _encode_envelope(envelope, lang) + b"}\n"
+    # pin one snapshot so a concurrent reload can't mix versions mid-stream
+    index = get_calendar_index()
+    fragments = day_fragments(index, lang)
+    span = index.span(envelope.start_utc, envelope.end_utc)
+    offset = hijri_offset(envelope.country)
+    for lo in range(span.start, span.stop, chunk_days):
+        hi = min(lo + chunk_days, span.stop)
+        local_ordinals = _project(index, envelope.timezone, lo, hi)
+        yield b"".join(item + b"\n" for item in iter_items(fragments, lo, hi, local_ordinals, offset))
+
+
+def encode_lunar_batch(envelopes: List[LunarEnvelope], lang: Optional[str] = None) -> bytes:
+    """
+    LunarBatchResponse for several envelopes at once: the index is sliced once
+    over the union UTC window and projected once per distinct timezone; each
+    envelope then takes its sub-slice of that projection.
+    """
+    index = get_calendar_index()
+    fragments = day_fragments(index, lang)
+    union = index.span(min(e.start_utc for e in envelopes), max(e.end_utc for e in envelopes))
+    projected = {
+        tzname: _project(index, tzname, union.start, union.stop) for tzname in {e.timezone for e in envelopes}
+    }
+    results = []
+    for envelope in envelopes:
+        span = index.span(envelope.start_utc, envelope.end_utc)
+        local_ordinals = projected[envelope.timezone][span.start - union.start:span.stop - union.start]
+        results.append(
+            _encode_envelope(envelope, lang)
+            + b',"items":['
+            + b",".join(
+                iter_items(fragments, span.start, span.stop, local_ordinals, hijri_offset(envelope.country))
+            )
+            + b"]}"
+        )
+    return b'{"results":[' + b",".join(results) + b"]}"
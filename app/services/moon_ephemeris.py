@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""Vectorized lunar ephemeris: tropical moon sign and moon phase classification.
+
+Everything operates on NumPy arrays, so a whole range of days (for any number
+of locations) is evaluated in one pass. Positions use the truncated series
+from Meeus, "Astronomical Algorithms" (ch. 25 for the Sun, the leading terms
+of ch. 47 for the Moon), which is accurate to a few hundredths of a degree
+over 1900-2100, well inside the 30-degree sign and 45-degree phase bins.
+Phases use the five names of the bundled files and existing Phase rows
+(see PHASE_NAMES), so generated days share their Phase and Recommendation rows.
+
+Library use:
+
+    ordinals, signs, phases = lunar_days_for_zone(date(2027, 1, 1), date(2027, 12, 31), "Asia/Baghdad")
+
+Generation command (writes `Calendar` rows, and optionally a JSON file in
+the same format as app/data/calendar/astrology/*.json):
+
+    python -m app.services.moon_ephemeris --year 2027 --timezone Asia/Baghdad --db postgres://...
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.timezones import zone_transitions
+
+# index 0 = Aries, in zodiac order; names match the bundled calendar files
+SIGN_NAMES: Tuple[Dict[str, str], ...] = (
+    {"en": "Aries", "ar": "الحمل", "fa": "حَمَل"},
+    {"en": "Taurus", "ar": "الثور", "fa": "ثور"},
+    {"en": "Gemini", "ar": "الجوزاء", "fa": "جوزا"},
+    {"en": "Cancer", "ar": "السرطان", "fa": "سرطان"},
+    {"en": "Leo", "ar": "الأسد", "fa": "اسد"},
+    {"en": "Virgo", "ar": "العذراء", "fa": "سنبله"},
+    {"en": "Libra", "ar": "الميزان", "fa": "میزان"},
+    {"en": "Scorpio", "ar": "العقرب", "fa": "عقرب"},
+    {"en": "Sagittarius", "ar": "القوس", "fa": "قوس"},
+    {"en": "Capricorn", "ar": "الجدي", "fa": "جدی"},
+    {"en": "Aquarius", "ar": "الدلو", "fa": "دلو"},
+    {"en": "Pisces", "ar": "الحوت", "fa": "حوت"},
+)
+
+# Elongation is binned into 8 phases of 45 degrees centred on k * 45, then folded
+# the way the bundled files and the existing Phase rows name them: a waning phase
+# takes the name of its waxing mirror image (Waning Gibbous -> Waxing Gibbous,
+# Last Quarter -> First Quarter, Waning Crescent -> Waxing Crescent).
+PHASE_NAMES: Tuple[Dict[str, str], ...] = (
+    {"en": "New Moon", "ar": "محاق", "fa": "محاق"},
+    {"en": "Waxing Crescent", "ar": "هلال متزايد", "fa": "هلال فزاینده"},
+    {"en": "First Quarter", "ar": "تربيع أول", "fa": "ربع‌اول"},
+    {"en": "Waxing Gibbous", "ar": "أحدب متزايد", "fa": "کوژِ فزاینده"},
+    {"en": "Full Moon", "ar": "بدر", "fa": "بدر (ماه کامل)"},
+)
+
+# Recommendation text is "<phase advice> <element advice>", as in the bundled files;
+# one phase advice per PHASE_NAMES entry.
+_PHASE_ADVICE: Tuple[Dict[str, str], ...] = (
+    {
+        "en": "Light rest and plan fresh starts.",
+        "ar": "راحة خفيفة وتخطيط لبدايات جديدة.",
+        "fa": "کمی استراحت و برنامه‌ریزی برای شروع‌های تازه.",
+    },
+    {
+        "en": "Good time to kick off new projects.",
+        "ar": "بداية جيدة للمشاريع الجديدة.",
+        "fa": "زمان خوبی برای آغاز پروژه‌های جدید.",
+    },
+    {
+        "en": "Make important decisions.",
+        "ar": "وقت مناسب لاتخاذ قرارات مهمة.",
+        "fa": "تصمیم‌های مهم بگیرید.",
+    },
+    {
+        "en": "Increase effort and refine details.",
+        "ar": "زيد من الجهد وحسّن التفاصيل.",
+        "fa": "تلاش را بیشتر کن و جزئیات را بهبود بده.",
+    },
+    {
+        "en": "High energy—reflect or celebrate.",
+        "ar": "طاقة عالية؛ التأمل والاحتفال مفيد.",
+        "fa": "انرژی بالاست؛ تأمل یا جشن بگیر.",
+    },
+)
+# fire, earth, air, water; sign index % 4 picks the element
+_ELEMENT_ADVICE: Tuple[Dict[str, str], ...] = (
+    {"en": "Add a dash of boldness.", "ar": "أضِف لمسة شجاعة.", "fa": "کمی جسارت اضافه کن."},
+    {
+        "en": "Anchor it with a realistic, measurable plan.",
+        "ar": "ثبّت خطة واقعية قابلة للقياس.",
+        "fa": "برنامه‌ای واقع‌بینانه و قابل‌اندازه‌گیری بچین.",
+    },
+    {
+        "en": "Open up to dialogue and fresh ideas.",
+        "ar": "انفتح على الحوار والأفكار الجديدة.",
+        "fa": "به گفتگو و ایده‌های تازه باز باش.",
+    },
+    {
+        "en": "Trust intuition and tend to feelings.",
+        "ar": "اتّبع إحساسك واهتم بالعاطفة.",
+        "fa": "به شهودت اعتماد کن و به احساس توجه کن.",
+    },
+)
+
+_J2000 = 2451545.0
+_ORDINAL_J2000_MIDNIGHT = date(2000, 1, 1).toordinal()  # JD 2451544.5
+_DELTA_T_DAYS = 69.2 / 86400.0  # TT - UTC, close enough for this century
+
+# Moon longitude terms (Meeus table 47.A): multiples of D, M, M', F and amplitude in 1e-6 degrees
+_MOON_TERMS = np.array(
+    [
+        (0, 0, 1, 0, 6288774),
+        (2, 0, -1, 0, 1274027),
+        (2, 0, 0, 0, 658314),
+        (0, 0, 2, 0, 213618),
+        (0, 1, 0, 0, -185116),
+        (0, 0, 0, 2, -114332),
+        (2, 0, -2, 0, 58793),
+        (2, -1, -1, 0, 57066),
+        (2, 0, 1, 0, 53322),
+        (2, -1, 0, 0, 45758),
+        (0, 1, -1, 0, -40923),
+        (1, 0, 0, 0, -34720),
+        (0, 1, 1, 0, -30383),
+        (2, 0, 0, -2, 15327),
+        (0, 0, 1, 2, -12528),
+        (0, 0, 1, -2, 10980),
+        (4, 0, -1, 0, 10675),
+        (0, 0, 3, 0, 10034),
+        (4, 0, -2, 0, 8548),
+        (2, 1, -1, 0, -7888),
+        (2, 1, 0, 0, -6766),
+        (1, 0, -1, 0, -5163),
+        (1, 1, 0, 0, 4987),
+        (2, -1, 1, 0, 4036),
+        (2, 0, 2, 0, 3994),
+    ],
+    dtype=np.float64,
+)
+
+
+def julian_day(utc_ordinals: np.ndarray, utc_minutes: np.ndarray) -> np.ndarray:
+    """Julian day (UT) for proleptic Gregorian day ordinals plus minutes after UTC midnight."""
+    return (
+        np.asarray(utc_ordinals, dtype=np.float64) - _ORDINAL_J2000_MIDNIGHT + (_J2000 - 0.5)
+        + np.asarray(utc_minutes, dtype=np.float64) / 1440.0
+    )
+
+
+def ecliptic_longitudes(jd: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Apparent geocentric (sun, moon) ecliptic longitudes in degrees, tropical, of date."""
+    t = (np.asarray(jd, dtype=np.float64) + _DELTA_T_DAYS - _J2000) / 36525.0
+    rad = np.radians
+
+    # Sun (Meeus ch. 25, low accuracy)
+    l0 = 280.46646 + 36000.76983 * t + 0.0003032 * t * t
+    m = 357.52911 + 35999.05029 * t - 0.0001537 * t * t
+    center = (
+        (1.914602 - 0.004817 * t - 0.000014 * t * t) * np.sin(rad(m))
+        + (0.019993 - 0.000101 * t) * np.sin(rad(2 * m))
+        + 0.000289 * np.sin(rad(3 * m))
+    )
+    omega = 125.04 - 1934.136 * t
+    nutation = -0.00478 * np.sin(rad(omega))
+    sun = l0 + center - 0.00569 + nutation
+
+    # Moon (Meeus ch. 47, leading terms)
+    lp = 218.3164477 + 481267.88123421 * t
+    d = 297.8501921 + 445267.1114034 * t
+    mp = 134.9633964 + 477198.8675055 * t
+    f = 93.2720950 + 483202.0175233 * t
+    e = 1.0 - 0.002516 * t - 0.0000074 * t * t
+    a1 = 119.75 + 131.849 * t
+    a2 = 53.09 + 479264.290 * t
+
+    # one (days x 4) @ (4 x terms) product gives every term's argument at once
+    args = np.radians(np.stack((d, m, mp, f), axis=1) @ _MOON_TERMS[:, :4].T)
+    # terms with M are scaled by E (the table only has |M| <= 1)
+    weights = np.where(_MOON_TERMS[:, 1] != 0, e[:, None], 1.0) * _MOON_TERMS[:, 4]
+    sigma_l = np.einsum("ij,ij->i", weights, np.sin(args))
+    sigma_l += 3958 * np.sin(rad(a1)) + 1962 * np.sin(rad(lp - f)) + 318 * np.sin(rad(a2))
+    moon = lp + sigma_l / 1e6 + nutation
+
+    return np.mod(sun, 360.0), np.mod(moon, 360.0)
+
+
+def classify(sun_lon: np.ndarray, moon_lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(sign index into SIGN_NAMES, phase index into PHASE_NAMES) from longitudes."""
+    signs = (np.floor_divide(moon_lon, 30.0).astype(np.int8)) % 12
+    elongation = np.mod(moon_lon - sun_lon, 360.0)
+    octants = (np.floor_divide(elongation + 22.5, 45.0).astype(np.int8)) % 8
+    phases = np.minimum(octants, 8 - octants)  # fold waning onto waxing
+    return signs, phases
+
+
+def local_to_utc_minutes(tzname: str, local_ordinals: np.ndarray, local_minutes: np.ndarray) -> np.ndarray:
+    """
+    Minutes since UTC midnight of `local_ordinals` for local wall-clock times in
+    `tzname`, resolved against the zone's transition table in two searchsorted
+    passes (guess the offset at the wall time, then at the resulting instant).
+    """
+    instants, offsets = zone_transitions(tzname)
+    instants_arr = np.asarray(instants, dtype=np.int64)
+    offsets_arr = np.asarray(offsets, dtype=np.int64)
+    epoch_ordinal = date(1970, 1, 1).toordinal()
+    wall = (np.asarray(local_ordinals, dtype=np.int64) - epoch_ordinal) * 86400 + np.asarray(local_minutes, dtype=np.int64) * 60
+    guess = offsets_arr[np.maximum(np.searchsorted(instants_arr, wall, side="right") - 1, 0)]
+    offset = offsets_arr[np.maximum(np.searchsorted(instants_arr, wall - guess, side="right") - 1, 0)]
+    return np.asarray(local_minutes, dtype=np.int64) - offset // 60
+
+
+def lunar_days(
+    local_ordinals: np.ndarray, reference_minutes: np.ndarray, utc_offset_minutes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sign and phase indexes for arrays of (local date, local reference time in
+    minutes, UTC offset in minutes); all arguments broadcast against each other.
+    """
+    utc_minutes = np.asarray(reference_minutes) - np.asarray(utc_offset_minutes)
+    sun, moon = ecliptic_longitudes(julian_day(local_ordinals, utc_minutes))
+    return classify(sun, moon)
+
+
+def lunar_days_for_zone(
+    start: date, end: date, tzname: str, reference: str = "12:00"
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(local ordinals, sign indexes, phase indexes) for every local day in [start .. end] at `reference`."""
+    hh, mm = (int(x) for x in reference.split(":"))
+    ordinals = np.arange(start.toordinal(), end.toordinal() + 1, dtype=np.int64)
+    local_minutes = np.full(ordinals.shape, hh * 60 + mm, dtype=np.int64)
+    utc_minutes = local_to_utc_minutes(tzname, ordinals, local_minutes)
+    signs, phases = classify(*ecliptic_longitudes(julian_day(ordinals, utc_minutes)))
+    return ordinals, signs, phases
+
+
+def recommendation_for(sign: int, phase: int) -> Dict[str, str]:
+    advice = _PHASE_ADVICE[phase]
+    element = _ELEMENT_ADVICE[sign % 4]
+    return {lang: f"{advice[lang]} {element[lang]}" for lang in ("en", "ar", "fa")}
+
+
+def calendar_payload(year: int, tzname: str, reference: str = "12:00") -> Dict:
+    """A year in the same JSON shape as the bundled lunar_calendar_*.json files."""
+    ordinals, signs, phases = lunar_days_for_zone(date(year, 1, 1), date(year, 12, 31), tzname, reference)
+    days: List[Dict] = []
+    for ordinal, sign, phase in zip(ordinals.tolist(), signs.tolist(), phases.tolist()):
+        days.append(
+            {
+                "date": date.fromordinal(ordinal).isoformat(),
+                "moonSign": dict(SIGN_NAMES[sign]),
+                "phase": dict(PHASE_NAMES[phase]),
+                "recommendations": recommendation_for(sign, phase),
+                "source": f"Computed at local {reference} ({tzname}) via app.services.moon_ephemeris; zodiac=tropical.",
+            }
+        )
+    return {
+        "year": year,
+        "timezone": tzname,
+        "localTimeReference": reference,
+        "calendarType": "Tropical Moon-sign + 8-phase",
+        "days": days,
+    }
+
+
+# ----------------------------
+# Generation command
+# ----------------------------
+async def generate_calendar_rows(year: int, tzname: str, reference: str, db_url: str) -> int:
+    """Insert `Calendar` rows for `year`, skipping UTC days that already exist. Returns rows created."""
+    from tortoise import Tortoise
+
+    from app.models.calendar import Calendar, MoonSign, Phase, Recommendation
+
+    await Tortoise.init(db_url=db_url, modules={"models": ["app.models.calendar"]})
+    try:
+        hh, mm = (int(x) for x in reference.split(":"))
+        ordinals, signs, phases = lunar_days_for_zone(date(year, 1, 1), date(year, 12, 31), tzname, reference)
+        utc_minutes = local_to_utc_minutes(tzname, ordinals, np.full(ordinals.shape, hh * 60 + mm))
+        utc_ordinals = ordinals + np.floor_divide(utc_minutes, 1440)
+
+        existing = set(
+            await Calendar.filter(
+                utc_date__gte=date.fromordinal(int(utc_ordinals.min())),
+                utc_date__lte=date.fromordinal(int(utc_ordinals.max())),
+            ).values_list("utc_date", flat=True)
+        )
+
+        cache: Dict[Tuple[type, str], object] = {}
+
+        async def get_or_create(model, names: Dict[str, str]):
+            key = (model, names["en"])
+            if key not in cache:
+                obj = await model.get_or_none(en_name=names["en"])
+                if obj is None:
+                    obj = await model.create(en_name=names["en"], ar_name=names["ar"], fa_name=names["fa"])
+                cache[key] = obj
+            return cache[key]
+
+        rows = []
+        for utc_ordinal, sign, phase in zip(utc_ordinals.tolist(), signs.tolist(), phases.tolist()):
+            utc_d = date.fromordinal(utc_ordinal)
+            if utc_d in existing:
+                continue
+            rows.append(
+                Calendar(
+                    utc_date=utc_d,
+                    utc_year=f"{utc_d.year:04d}",
+                    utc_month=f"{utc_d.month:02d}",
+                    utc_day=f"{utc_d.day:02d}",
+                    moon_sign=await get_or_create(MoonSign, SIGN_NAMES[sign]),
+                    phase=await get_or_create(Phase, PHASE_NAMES[phase]),
+                    recommendation=await get_or_create(Recommendation, recommendation_for(sign, phase)),
+                )
+            )
+        if rows:
+            await Calendar.bulk_create(rows, batch_size=200)
+        return len(rows)
+    finally:
+        await Tortoise.close_connections()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Generate lunar calendar days (moon sign + phase) for a year.")
+    parser.add_argument("--year", type=int, required=True)
+    parser.add_argument("--timezone", default="Asia/Baghdad", help="IANA zone the reference time is local to")
+    parser.add_argument("--reference", default="12:00", help="Local time of day to evaluate, HH:MM")
+    parser.add_argument("--db", default=os.getenv("DATABASE_URL"), help="Database URL to insert Calendar rows into")
+    parser.add_argument("--json", help="Also write the year to this path in the bundled calendar file format")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(calendar_payload(args.year, args.timezone, args.reference), f, ensure_ascii=False, indent=2)
+        print(f"Wrote {args.json}")
+    if args.db:
+        created = asyncio.run(generate_calendar_rows(args.year, args.timezone, args.reference, args.db))
+        print(f"Inserted {created} calendar rows for {args.year} ({args.timezone} @ {args.reference}).")
+        print("Reload running workers with POST /api/v1/calendar/lunar/reload.")
+
+
+if __name__ == "__main__":
+    main()
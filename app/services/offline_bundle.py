@@ -0,0 +1,85 @@
+"""Yearly offline bundles: a province's prayer times and its country's lunar calendar.
+
+One bundle per (province, year, lang) holds every day of the year, so an app
+downloads it once instead of calling the daily endpoints. The JSON body is
+
+    {"province_code": ..., "city_name": ..., "lat": ..., "lng": ..., "tz": ...,
+     "year": 2026, "lang": "en", "params": {...},
+     "prayer_times": {"fields": ["date", "hijri_date", "fajr", ...],
+                      "days": [["2026-01-01", "1447-07-12", "05:31", ...], ...]},
+     "lunar": <the /calendar/lunar response for the year, projected to `lang`>}
+
+and is gzip-compressed once with a fixed header timestamp, so the same data
+always yields the same bytes and the bytes can be addressed by their hash.
+Prayer times use the default parameters (see `app.services.prayer_times`).
+"""
+
+import gzip
+import json
+from datetime import date
+
+import numpy as np
+
+from app.schemas.calendar import LunarEnvelope
+from app.services.country_zones import country_timezone
+from app.services.hijri import hijri_isos, hijri_offset
+from app.services.lunar_json import encode_lunar_response
+from app.services.prayer_times import (
+    DEFAULT_FAJR_ANGLE,
+    DEFAULT_MAGHRIB_OFFSET_MIN,
+    DEFAULT_MIDNIGHT_MODE,
+    EVENTS,
+    format_hhmm,
+    six_times_minutes,
+)
+from app.services.province_registry import ProvinceEntry
+
+
+def _prayer_days(city: ProvinceEntry, year: int) -> list:
+    first, last = date(year, 1, 1), date(year, 12, 31)
+    minutes = six_times_minutes(
+        np.arange(first.toordinal(), last.toordinal() + 1),
+        city.lat,
+        city.lng,
+        city.tz,
+        fajr_angle=DEFAULT_FAJR_ANGLE,
+        maghrib_offset_min=DEFAULT_MAGHRIB_OFFSET_MIN,
+        midnight_mode=DEFAULT_MIDNIGHT_MODE,
+    )
+    columns = [format_hhmm(minutes[event]).tolist() for event in EVENTS]
+    offset = hijri_offset(city.country_code)
+    hijris = hijri_isos(range(first.toordinal() + offset, last.toordinal() + offset + 1))
+    return [
+        [date.fromordinal(first.toordinal() + i).isoformat(), hijris[i], *(col[i] for col in columns)]
+        for i in range(len(columns[0]))
+    ]
+
+
+def encode_bundle(city: ProvinceEntry, year: int, lang: str, lunar_envelope: LunarEnvelope) -> bytes:
+    """The gzip-compressed bundle; `lunar_envelope` is the country's local year."""
+    head = {
+        "province_code": city.iso_3166_2,
+        "city_name": city.name,
+        "lat": city.lat,
+        "lng": city.lng,
+        "tz": city.tz,
+        "year": year,
+        "lang": lang,
+        "params": {
+            "fajr_angle": DEFAULT_FAJR_ANGLE,
+            "maghrib_offset_min": DEFAULT_MAGHRIB_OFFSET_MIN,
+            "midnight_mode": DEFAULT_MIDNIGHT_MODE,
+        },
+        "prayer_times": {"fields": ["date", "hijri_date", *EVENTS], "days": _prayer_days(city, year)},
+    }
+    body = b"%s,\"lunar\":%s}" % (
+        json.dumps(head, ensure_ascii=False, separators=(",", ":")).encode()[:-1],
+        encode_lunar_response(lunar_envelope, lang),
+    )
+    # mtime=0 keeps the output a pure function of the data
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def bundle_timezone(city: ProvinceEntry) -> str:
+    """Zone whose local year the bundle's lunar days follow."""
+    return country_timezone(city.country_code)
@@ -0,0 +1,196 @@
+"""Named calculation methods with imsak, asr and isha.
+
+A `PrayerMethod` describes one convention (twilight angles, minute offsets,
+asr shadow factor, midnight rule); `METHODS` holds the usual presets with
+the parameters praytimes.org publishes, plus "Default", the parameters this
+API has always used (its fajr..midnight equal `compute_six_times`).
+
+Every event is the hour angle at which the sun reaches some zenith, so per
+(day, location) the engine reads the day-of-year ephemeris once, forms the
+two products every hour angle shares, and then pays one arccos per event.
+`method_times` is the scalar form and `method_times_minutes` the batched
+one; both round like the existing kernel and agree to the minute.
+"""
+
+import math
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Literal, Optional
+
+import numpy as np
+
+from app.services.prayer_times import (
+    COS_DECL_TABLE,
+    DECL_TABLE,
+    EOT_TABLE,
+    SIN_DECL_TABLE,
+    day_of_year,
+    rounded_minutes,
+)
+
+MethodMidnight = Literal["sunset_to_sunrise", "sunset_to_fajr", "maghrib_to_fajr"]
+METHOD_EVENTS = ("imsak", "fajr", "sunrise", "dhuhr", "asr", "sunset", "maghrib", "isha", "midnight")
+
+_SUNRISE_ZENITH = 90.833  # refraction and solar radius
+
+
+@dataclass(frozen=True)
+class PrayerMethod:
+    """
+    One calculation convention. Maghrib and isha are either a twilight angle or
+    minutes after the previous event (sunset, maghrib); imsak likewise before fajr.
+    """
+
+    name: str
+    fajr_angle: float
+    isha_angle: Optional[float] = None
+    isha_minutes: float = 0.0  # after maghrib, when isha_angle is None
+    maghrib_angle: Optional[float] = None
+    maghrib_minutes: float = 0.0  # after sunset, when maghrib_angle is None
+    imsak_angle: Optional[float] = None
+    imsak_minutes: float = 10.0  # before fajr, when imsak_angle is None
+    asr_factor: float = 1.0  # shadow length over object length past the noon shadow; 2 = Hanafi
+    midnight_mode: MethodMidnight = "sunset_to_sunrise"
+
+
+METHODS: Dict[str, PrayerMethod] = {
+    m.name: m
+    for m in (
+        PrayerMethod("Default", fajr_angle=17.7, isha_angle=14.0, maghrib_minutes=4.0, midnight_mode="maghrib_to_fajr"),
+        PrayerMethod("MWL", fajr_angle=18.0, isha_angle=17.0),
+        PrayerMethod("ISNA", fajr_angle=15.0, isha_angle=15.0),
+        PrayerMethod("Egypt", fajr_angle=19.5, isha_angle=17.5),
+        PrayerMethod("Makkah", fajr_angle=18.5, isha_minutes=90.0),
+        PrayerMethod("Karachi", fajr_angle=18.0, isha_angle=18.0),
+        PrayerMethod("Tehran", fajr_angle=17.7, isha_angle=14.0, maghrib_angle=4.5, midnight_mode="sunset_to_fajr"),
+        PrayerMethod("Jafari", fajr_angle=16.0, isha_angle=14.0, maghrib_angle=4.0, midnight_mode="sunset_to_fajr"),
+    )
+}
+
+
+def get_method(name: str) -> PrayerMethod:
+    """Preset by name, case-insensitively; KeyError when unknown."""
+    for key, method in METHODS.items():
+        if key.lower() == name.lower():
+            return method
+    raise KeyError(name)
+
+
+# Asr: the sun's altitude is arccot(factor + tan|lat - decl|), and cos(zenith) = sin(altitude)
+# = 1 / sqrt(1 + x^2) for that cotangent x.
+def _asr_cos_zenith(lat_rad: float, decl_rad: float, factor: float) -> float:
+    x = factor + math.tan(abs(lat_rad - decl_rad))
+    return 1.0 / math.sqrt(1.0 + x * x)
+
+
+def _asr_cos_zenith_array(lat_rad, decl_rad, factor: float):
+    x = factor + np.tan(np.abs(lat_rad - decl_rad))
+    return 1.0 / np.sqrt(1.0 + x * x)
+
+
+def _midnight_bounds(mode: MethodMidnight, out):
+    if mode == "maghrib_to_fajr":
+        return out["maghrib"], out["fajr"]
+    if mode == "sunset_to_fajr":
+        return out["sunset"], out["fajr"]
+    return out["sunset"], out["sunrise"]
+
+
+# ---------------------------
+# Scalar
+# ---------------------------
+def _round_minute(m: float) -> int:
+    """`rounded_minutes` for one value."""
+    day_shift = m // 1440.0
+    m -= day_shift * 1440.0
+    return int(day_shift * 1440 + (m // 60.0) * 60 + round(m % 60.0))
+
+
+def method_times(
+    the_date: date, lat_deg: float, lon_east_deg: float, tz_hours: float, method: PrayerMethod
+) -> Dict[str, str]:
+    """'HH:MM' for every event of METHOD_EVENTS on one date at one location."""
+    n = the_date.timetuple().tm_yday
+    lat = math.radians(lat_deg)
+    decl = float(DECL_TABLE[n])
+    noon = 720 - (float(EOT_TABLE[n]) + 4 * lon_east_deg - 60 * tz_hours)
+    # shared by every hour angle
+    a = math.sin(lat) * float(SIN_DECL_TABLE[n])
+    b = math.cos(lat) * float(COS_DECL_TABLE[n])
+
+    def at(cos_zenith: float, sign: int) -> float:
+        cos_omega = max(-1.0, min(1.0, (cos_zenith - a) / b))
+        return noon + sign * 4 * math.degrees(math.acos(cos_omega))
+
+    def angle(degrees_below_horizon: float, sign: int) -> float:
+        return at(math.cos(math.radians(90 + degrees_below_horizon)), sign)
+
+    sunrise = at(math.cos(math.radians(_SUNRISE_ZENITH)), -1)
+    sunset = at(math.cos(math.radians(_SUNRISE_ZENITH)), +1)
+    fajr = angle(method.fajr_angle, -1)
+    raw = {
+        "imsak": angle(method.imsak_angle, -1) if method.imsak_angle is not None else fajr - method.imsak_minutes,
+        "fajr": fajr,
+        "sunrise": sunrise,
+        "dhuhr": noon,
+        "asr": at(_asr_cos_zenith(lat, decl, method.asr_factor), +1),
+        "sunset": sunset,
+    }
+    raw["maghrib"] = angle(method.maghrib_angle, +1) if method.maghrib_angle is not None else sunset + method.maghrib_minutes
+    if method.isha_angle is not None:
+        raw["isha"] = angle(method.isha_angle, +1)
+    else:
+        raw["isha"] = raw["maghrib"] + method.isha_minutes
+
+    out = {event: _round_minute(m) for event, m in raw.items()}
+    start, end = _midnight_bounds(method.midnight_mode, out)
+    if end <= start:
+        end += 1440
+    out["midnight"] = (start + end) // 2
+    return {event: "%02d:%02d" % divmod(out[event] % 1440, 60) for event in METHOD_EVENTS}
+
+
+# ---------------------------
+# Batched
+# ---------------------------
+def method_times_minutes(ordinals, lat_deg, lon_east_deg, tz_hours, method: PrayerMethod) -> Dict[str, np.ndarray]:
+    """
+    Minutes from local midnight of every METHOD_EVENTS event, broadcasting like
+    `six_times_minutes` (e.g. ordinals (days,) against coordinates (places, 1)).
+    """
+    n = day_of_year(ordinals)
+    lat = np.radians(np.asarray(lat_deg, dtype=np.float64))
+    noon = 720 - (EOT_TABLE[n] + 4 * np.asarray(lon_east_deg, dtype=np.float64) - 60 * np.asarray(tz_hours, dtype=np.float64))
+    a = np.sin(lat) * SIN_DECL_TABLE[n]
+    b = np.cos(lat) * COS_DECL_TABLE[n]
+    noon = np.broadcast_to(noon, np.broadcast_shapes(noon.shape, a.shape))
+
+    def at(cos_zenith, sign: int):
+        cos_omega = np.clip((cos_zenith - a) / b, -1.0, 1.0)
+        return noon + sign * 4 * np.degrees(np.arccos(cos_omega))
+
+    def angle(degrees_below_horizon: float, sign: int):
+        return at(math.cos(math.radians(90 + degrees_below_horizon)), sign)
+
+    sunrise = at(math.cos(math.radians(_SUNRISE_ZENITH)), -1)
+    sunset = at(math.cos(math.radians(_SUNRISE_ZENITH)), +1)
+    fajr = angle(method.fajr_angle, -1)
+    raw = {
+        "imsak": angle(method.imsak_angle, -1) if method.imsak_angle is not None else fajr - method.imsak_minutes,
+        "fajr": fajr,
+        "sunrise": sunrise,
+        "dhuhr": noon,
+        "asr": at(_asr_cos_zenith_array(lat, DECL_TABLE[n], method.asr_factor), +1),
+        "sunset": sunset,
+    }
+    raw["maghrib"] = angle(method.maghrib_angle, +1) if method.maghrib_angle is not None else sunset + method.maghrib_minutes
+    if method.isha_angle is not None:
+        raw["isha"] = angle(method.isha_angle, +1)
+    else:
+        raw["isha"] = raw["maghrib"] + method.isha_minutes
+
+    out = {event: rounded_minutes(m) for event, m in raw.items()}
+    start, end = _midnight_bounds(method.midnight_mode, out)
+    end = np.where(end <= start, end + 1440, end)
+    out["midnight"] = np.floor_divide(start + end, 2)
+    return {event: out[event] for event in METHOD_EVENTS}
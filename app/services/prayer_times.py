@@ -0,0 +1,270 @@
+"""Prayer-time math: the scalar reference and a batched NumPy kernel.
+
+`compute_six_times` handles one date at one location and returns aware
+datetimes. `six_times_minutes` evaluates every (day, location) pair of its
+broadcast inputs at once. It returns each event as whole minutes from the
+local midnight of its date, rounded exactly the way `_to_local_datetime`
+rounds, so `format_hhmm` yields the same "HH:MM" strings as the scalar path.
+Both read the equation of time and declination (with its sine and cosine)
+from one day-of-year table built at import.
+"""
+
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Literal, Tuple
+
+import numpy as np
+
+from app.services.province_registry import country_provinces
+
+MidnightMode = Literal["maghrib_to_fajr", "sunset_to_sunrise"]
+EVENTS = ("fajr", "sunrise", "dhuhr", "sunset", "maghrib", "midnight")
+
+# parameters of the precomputed outputs (offline bundles)
+DEFAULT_FAJR_ANGLE = 17.7
+DEFAULT_MAGHRIB_OFFSET_MIN = 4.0
+DEFAULT_MIDNIGHT_MODE: MidnightMode = "maghrib_to_fajr"
+
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# "HH:MM" for every minute of the day
+_HHMM = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(1440)])
+
+
+# ---------------------------
+# Scalar reference
+# ---------------------------
+def _equation_of_time_and_declination(n: int):
+    gamma = 2 * math.pi / 365 * (n - 1)
+    eot = 229.18 * (
+        0.000075
+        + 0.001868 * math.cos(gamma)
+        - 0.032077 * math.sin(gamma)
+        - 0.014615 * math.cos(2 * gamma)
+        - 0.040849 * math.sin(2 * gamma)
+    )
+    decl = (
+        0.006918
+        - 0.399912 * math.cos(gamma)
+        + 0.070257 * math.sin(gamma)
+        - 0.006758 * math.cos(2 * gamma)
+        + 0.000907 * math.sin(2 * gamma)
+        - 0.002697 * math.cos(3 * gamma)
+        + 0.00148 * math.sin(3 * gamma)
+    )
+    return eot, decl
+
+def _solar_noon_minutes(lon_east_deg: float, tz_hours: float, eot_min: float) -> float:
+    time_offset = eot_min + 4 * lon_east_deg - 60 * tz_hours
+    return 720 - time_offset
+
+# Day-of-year solar ephemeris, index n = 1..366 (0 unused). It depends on nothing
+# else, so it is built once here and every location only pays for its hour angles.
+_EPHEMERIS = [_equation_of_time_and_declination(n) for n in range(367)]
+EOT_TABLE = np.array([eot for eot, _ in _EPHEMERIS])
+DECL_TABLE = np.array([decl for _, decl in _EPHEMERIS])
+SIN_DECL_TABLE = np.array([math.sin(decl) for _, decl in _EPHEMERIS])
+COS_DECL_TABLE = np.array([math.cos(decl) for _, decl in _EPHEMERIS])
+_SIN_COS_DECL = [(math.sin(decl), math.cos(decl)) for _, decl in _EPHEMERIS]
+
+
+def solar_ephemeris(n: int):
+    """(equation of time in minutes, declination in radians) for day of year `n`."""
+    return _EPHEMERIS[n]
+
+def _event_time_by_zenith(
+    sin_lat: float, cos_lat: float, sin_decl: float, cos_decl: float, solar_noon_min: float, zenith_deg: float, sign: int
+) -> float:
+    # sign -1 = morning, +1 = evening
+    zen = math.radians(zenith_deg)
+    cos_omega = (math.cos(zen) - sin_lat * sin_decl) / (cos_lat * cos_decl)
+    cos_omega = max(-1.0, min(1.0, cos_omega))
+    omega_deg = math.degrees(math.acos(cos_omega))
+    return solar_noon_min + sign * 4 * omega_deg
+
+def _to_local_datetime(d: date, minutes_from_midnight: float, tz_hours: float) -> datetime:
+    m = minutes_from_midnight
+    # normalize across day bounds
+    while m < 0:
+        d = d - timedelta(days=1)
+        m += 1440
+    while m >= 1440:
+        d = d + timedelta(days=1)
+        m -= 1440
+    hh = int(m // 60)
+    mm = int(round(m % 60))
+    if mm == 60:
+        mm = 0
+        hh += 1
+    tz = timezone(timedelta(hours=int(tz_hours), minutes=int(round((tz_hours - int(tz_hours)) * 60))))
+    return datetime(d.year, d.month, d.day, hh, mm, tzinfo=tz)
+
+def compute_six_times(
+    the_date: date,
+    lat_deg: float,
+    lon_east_deg: float,
+    tz_hours: float,
+    *,
+    fajr_angle: float = 17.7,
+    maghrib_offset_min: float = 4.0,
+    midnight_mode: MidnightMode = "maghrib_to_fajr",
+):
+    lat_rad = math.radians(lat_deg)
+    n = the_date.timetuple().tm_yday
+    eot, _ = solar_ephemeris(n)
+    solar_noon_min = _solar_noon_minutes(lon_east_deg, tz_hours, eot)
+    angles = (math.sin(lat_rad), math.cos(lat_rad), *_SIN_COS_DECL[n], solar_noon_min)
+
+    # Sunrise/Sunset with refraction & solar radius
+    sunrise_min = _event_time_by_zenith(*angles, 90.833, -1)
+    sunset_min  = _event_time_by_zenith(*angles, 90.833, +1)
+
+    # Fajr at twilight angle
+    fajr_zenith = 90 + fajr_angle
+    fajr_min = _event_time_by_zenith(*angles, fajr_zenith, -1)
+
+    # Dhuhr (solar noon)
+    dhuhr_min = solar_noon_min
+
+    # Maghrib as sunset + offset (set 0 to equal sunset)
+    maghrib_min = sunset_min + maghrib_offset_min
+
+    # Midnight (nisf al-layl)
+    if midnight_mode == "maghrib_to_fajr":
+        start_dt = _to_local_datetime(the_date, maghrib_min, tz_hours)
+        end_dt = _to_local_datetime(the_date, fajr_min, tz_hours)
+        if end_dt <= start_dt:
+            end_dt = end_dt + timedelta(days=1)
+    else:  # "sunset_to_sunrise"
+        start_dt = _to_local_datetime(the_date, sunset_min, tz_hours)
+        end_dt = _to_local_datetime(the_date, sunrise_min, tz_hours)
+        if end_dt <= start_dt:
+            end_dt = end_dt + timedelta(days=1)
+    midnight_dt = start_dt + (end_dt - start_dt) / 2
+
+    return {
+        "fajr": _to_local_datetime(the_date, fajr_min, tz_hours),
+        "sunrise": _to_local_datetime(the_date, sunrise_min, tz_hours),
+        "dhuhr": _to_local_datetime(the_date, dhuhr_min, tz_hours),
+        "sunset": _to_local_datetime(the_date, sunset_min, tz_hours),
+        "maghrib": _to_local_datetime(the_date, maghrib_min, tz_hours),
+        "midnight": midnight_dt,
+    }
+
+
+# ---------------------------
+# Batched kernel
+# ---------------------------
+def day_of_year(ordinals: np.ndarray) -> np.ndarray:
+    """1-based day of year for proleptic Gregorian day ordinals."""
+    days = (np.asarray(ordinals, dtype=np.int64) - _UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+    return (days - days.astype("datetime64[Y]").astype("datetime64[D]")).astype(np.int64) + 1
+
+
+def _event_minutes_by_zenith(sin_lat, cos_lat, sin_decl, cos_decl, solar_noon_min, zenith_deg: float, sign: int):
+    zen = math.radians(zenith_deg)
+    cos_omega = (math.cos(zen) - sin_lat * sin_decl) / (cos_lat * cos_decl)
+    omega_deg = np.degrees(np.arccos(np.clip(cos_omega, -1.0, 1.0)))
+    return solar_noon_min + sign * 4 * omega_deg
+
+
+def rounded_minutes(m: np.ndarray) -> np.ndarray:
+    """Whole minutes from local midnight of the date, as `_to_local_datetime` rounds them."""
+    day_shift = np.floor_divide(m, 1440.0)
+    m = m - day_shift * 1440.0
+    hh = np.floor_divide(m, 60.0)
+    mm = np.round(np.remainder(m, 60.0))  # half-to-even, like round()
+    return (day_shift * 1440 + hh * 60 + mm).astype(np.int64)
+
+
+def six_times_minutes(
+    ordinals,
+    lat_deg,
+    lon_east_deg,
+    tz_hours,
+    *,
+    fajr_angle: float = 17.7,
+    maghrib_offset_min: float = 4.0,
+    midnight_mode: MidnightMode = "maghrib_to_fajr",
+) -> Dict[str, np.ndarray]:
+    """
+    Minutes from local midnight (may fall outside 0..1439) of each event, for
+    every day ordinal and location; the arguments broadcast against each
+    other, e.g. ordinals of shape (days,) with coordinates of shape (places, 1).
+    """
+    n = day_of_year(ordinals)
+    lat_rad = np.radians(np.asarray(lat_deg, dtype=np.float64))
+    solar_noon_min = 720 - (EOT_TABLE[n] + 4 * np.asarray(lon_east_deg, dtype=np.float64) - 60 * np.asarray(tz_hours, dtype=np.float64))
+    angles = (np.sin(lat_rad), np.cos(lat_rad), SIN_DECL_TABLE[n], COS_DECL_TABLE[n], solar_noon_min)
+
+    sunrise_min = _event_minutes_by_zenith(*angles, 90.833, -1)
+    sunset_min = _event_minutes_by_zenith(*angles, 90.833, +1)
+    fajr_min = _event_minutes_by_zenith(*angles, 90 + fajr_angle, -1)
+    maghrib_min = sunset_min + maghrib_offset_min
+
+    out = {
+        "fajr": rounded_minutes(fajr_min),
+        "sunrise": rounded_minutes(sunrise_min),
+        "dhuhr": rounded_minutes(np.broadcast_to(solar_noon_min, sunrise_min.shape)),
+        "sunset": rounded_minutes(sunset_min),
+        "maghrib": rounded_minutes(maghrib_min),
+    }
+    if midnight_mode == "maghrib_to_fajr":
+        start, end = out["maghrib"], out["fajr"]
+    else:
+        start, end = out["sunset"], out["sunrise"]
+    end = np.where(end <= start, end + 1440, end)
+    # the midpoint can land on a half minute; "HH:MM" drops the seconds
+    out["midnight"] = np.floor_divide(start + end, 2)
+    return out
+
+
+def format_hhmm(minutes: np.ndarray) -> np.ndarray:
+    """'HH:MM' wall-clock strings for minutes from (any) local midnight."""
+    return _HHMM[np.remainder(minutes, 1440)]
+
+
+# ---------------------------
+# Country fan-out
+# ---------------------------
+def country_prayer_times(
+    country_shortcode: str,
+    the_date: date,
+    *,
+    fajr_angle: float = 17.7,
+    maghrib_offset_min: float = 4.0,
+    midnight_mode: MidnightMode = "maghrib_to_fajr",
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Times on `the_date` for every province of a country: coordinates come from
+    the province registry, then one kernel pass covers all of them. Returns
+    (provinces ordered by code, codes of provinces lacking lat/lng/tz).
+    """
+    entries = country_provinces(country_shortcode)
+    located = [p for p in entries if p.has_coordinates]
+    missing = [p.iso_3166_2 for p in entries if not p.has_coordinates]
+    if not located:
+        return [], missing
+
+    coords = np.array([(p.lat, p.lng, p.tz) for p in located], dtype=np.float64)
+    minutes = six_times_minutes(
+        np.array([the_date.toordinal()]),
+        coords[:, 0],
+        coords[:, 1],
+        coords[:, 2],
+        fajr_angle=fajr_angle,
+        maghrib_offset_min=maghrib_offset_min,
+        midnight_mode=midnight_mode,
+    )
+    columns = {event: format_hhmm(minutes[event]).tolist() for event in EVENTS}
+    provinces = [
+        {
+            "province_code": p.iso_3166_2,
+            "city_name": p.name,
+            "lat": p.lat,
+            "lng": p.lng,
+            "tz": p.tz,
+            "times": {event: columns[event][i] for event in EVENTS},
+        }
+        for i, p in enumerate(located)
+    ]
+    return provinces, missing
@@ -0,0 +1,122 @@
+"""Nearest-province lookup over the province registry.
+
+Province coordinates are mapped to unit vectors on the sphere, where the
+straight-line (chord) distance orders points exactly like the great-circle
+distance, and indexed with a static 3-d KD-tree. A single query visits a
+few leaves (tens of microseconds in pure Python); batches use one NumPy
+dot-product pass per chunk instead. The tree is rebuilt lazily whenever
+the registry version changes.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.province_registry import ProvinceEntry, province_entries, registry_version
+
+EARTH_RADIUS_KM = 6371.0088
+_BATCH_CHUNK = 1024
+
+
+def unit_vector(lat_deg: float, lng_deg: float) -> Tuple[float, float, float]:
+    lat, lng = math.radians(lat_deg), math.radians(lng_deg)
+    return math.cos(lat) * math.cos(lng), math.cos(lat) * math.sin(lng), math.sin(lat)
+
+
+def chord_to_km(chord: float) -> float:
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+_LEAF_SIZE = 8
+
+# A tree node is (axis, split, left, right); a leaf is (-1, 0.0, ((x, y, z, index), ...), None).
+_Node = Tuple[int, float, Any, Any]
+
+
+def _build_tree(items: List[Tuple[float, float, float, int]], depth: int = 0) -> _Node:
+    if len(items) <= _LEAF_SIZE:
+        return -1, 0.0, tuple(items), None
+    axis = depth % 3
+    items.sort(key=lambda item: item[axis])
+    mid = len(items) // 2
+    return axis, items[mid][axis], _build_tree(items[:mid], depth + 1), _build_tree(items[mid:], depth + 1)
+
+
+@dataclass(frozen=True)
+class ProvinceLocator:
+    """Static KD-tree (with small brute-force leaves) over the located provinces."""
+
+    version: int
+    entries: Tuple[ProvinceEntry, ...]
+    tree: _Node
+    matrix: np.ndarray  # the same unit vectors as an (n, 3) array, for batches
+
+    @classmethod
+    def build(cls, version: int, entries: Sequence[ProvinceEntry]) -> "ProvinceLocator":
+        located = tuple(p for p in entries if p.has_coordinates)
+        points = [unit_vector(p.lat, p.lng) for p in located]
+        return cls(
+            version=version,
+            entries=located,
+            tree=_build_tree([(*point, i) for i, point in enumerate(points)]),
+            matrix=np.array(points, dtype=np.float64).reshape(-1, 3),
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def nearest(self, lat_deg: float, lng_deg: float) -> Optional[Tuple[ProvinceEntry, float]]:
+        """(province, great-circle distance in km) closest to the coordinates."""
+        if not self.entries:
+            return None
+        q = unit_vector(lat_deg, lng_deg)
+        qx, qy, qz = q
+        best = [math.inf, -1]  # squared chord, entry index
+
+        def visit(node: _Node) -> None:
+            axis, split, left, right = node
+            if axis < 0:
+                for x, y, z, i in left:
+                    d2 = (x - qx) ** 2 + (y - qy) ** 2 + (z - qz) ** 2
+                    if d2 < best[0]:
+                        best[0], best[1] = d2, i
+                return
+            diff = q[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            visit(near)
+            if diff * diff < best[0]:
+                visit(far)
+
+        visit(self.tree)
+        return self.entries[best[1]], chord_to_km(math.sqrt(best[0]))
+
+    def nearest_many(self, lats: Sequence[float], lngs: Sequence[float]) -> List[Tuple[ProvinceEntry, float]]:
+        """`nearest` for many coordinates at once (max dot product == min distance)."""
+        if not self.entries:
+            return []
+        lat = np.radians(np.asarray(lats, dtype=np.float64))
+        lng = np.radians(np.asarray(lngs, dtype=np.float64))
+        queries = np.stack((np.cos(lat) * np.cos(lng), np.cos(lat) * np.sin(lng), np.sin(lat)), axis=1)
+        out: List[Tuple[ProvinceEntry, float]] = []
+        for lo in range(0, len(queries), _BATCH_CHUNK):
+            dots = queries[lo:lo + _BATCH_CHUNK] @ self.matrix.T
+            best = np.argmax(dots, axis=1)
+            cos_angle = np.clip(dots[np.arange(len(best)), best], -1.0, 1.0)
+            km = EARTH_RADIUS_KM * np.arccos(cos_angle)
+            out.extend((self.entries[i], d) for i, d in zip(best.tolist(), km.tolist()))
+        return out
+
+
+_locator: Optional[ProvinceLocator] = None
+
+
+def get_province_locator() -> ProvinceLocator:
+    """The locator for the current registry, rebuilt if provinces changed since."""
+    global _locator
+    version = registry_version()
+    locator = _locator
+    if locator is None or locator.version != version:
+        locator = _locator = ProvinceLocator.build(version, province_entries())
+    return locator
@@ -0,0 +1,96 @@
+"""Process-local registry of provinces keyed by iso_3166_2.
+
+Prayer-time requests only need a province's name, coordinates and UTC
+offset, so all provinces are loaded once (one query, at startup) into
+immutable entries. Province and Country saves and deletes reload the
+registry through Tortoise signals, and the new dict replaces the old one
+in one assignment. A code missing from the registry is looked up in the
+database once, so provinces created by another worker still resolve.
+"""
+
+from dataclasses import dataclass
+from itertools import count
+from typing import Dict, List, Optional
+
+from tortoise.signals import post_delete, post_save
+
+from app.models.country import Country, Province
+
+_versions = count(1)
+
+
+@dataclass(frozen=True)
+class ProvinceEntry:
+    id: int
+    iso_3166_2: str
+    name: str
+    lat: Optional[float]
+    lng: Optional[float]
+    tz: Optional[float]
+    country_id: int
+    country_code: Optional[str]
+
+    @property
+    def has_coordinates(self) -> bool:
+        return self.lat is not None and self.lng is not None and self.tz is not None
+
+
+_FIELDS = ("id", "iso_3166_2", "name", "lat", "lng", "tz", "country_id", "country__iso_alpha2")
+
+_provinces: Dict[str, ProvinceEntry] = {}
+_version = 0
+
+
+def _entry(row) -> ProvinceEntry:
+    pid, code, name, lat, lng, tz, country_id, cc = row
+    return ProvinceEntry(pid, code, name, lat, lng, tz, country_id, cc.upper() if cc else None)
+
+
+def registry_version() -> int:
+    """Bumped on every change, for indexes and caches built from the registry."""
+    return _version
+
+
+async def load_province_registry() -> Dict[str, ProvinceEntry]:
+    global _provinces, _version
+    rows = await Province.filter(iso_3166_2__isnull=False).order_by("iso_3166_2").values_list(*_FIELDS)
+    _provinces = {row[1]: _entry(row) for row in rows}
+    _version = next(_versions)
+    return _provinces
+
+
+def province_entries() -> List[ProvinceEntry]:
+    """Every registered province."""
+    return list(_provinces.values())
+
+
+def country_provinces(country_shortcode: str) -> List[ProvinceEntry]:
+    """A country's provinces, ordered by code."""
+    cc = country_shortcode.upper()
+    return sorted((p for p in _provinces.values() if p.country_code == cc), key=lambda p: p.iso_3166_2)
+
+
+async def get_province(code: str) -> Optional[ProvinceEntry]:
+    """The province for an iso_3166_2 code; the database is consulted only on a registry miss."""
+    global _provinces, _version
+    entry = _provinces.get(code)
+    if entry is not None:
+        return entry
+    row = await Province.filter(iso_3166_2=code).first().values_list(*_FIELDS)
+    if not row:
+        return None
+    entry = _entry(row)
+    _provinces = {**_provinces, code: entry}
+    _version = next(_versions)
+    return entry
+
+
+@post_save(Province, Country)
+async def _on_province_saved(sender, instance, created, using_db, update_fields) -> None:
+    # a renamed code or a moved country isn't visible on the instance alone
+    await load_province_registry()
+
+
+@post_delete(Province, Country)
+async def _on_province_deleted(sender, instance, using_db) -> None:
+    await load_province_registry()
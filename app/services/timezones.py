@@ -0,0 +1,102 @@
+"""Timezone helpers shared by the calendar endpoints."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from functools import lru_cache
+from typing import Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+import pytz
+
+_EPOCH = datetime(1970, 1, 1)
+_MIN_EPOCH = -(1 << 62)
+
+
+class ZoneProjection:
+    """
+    Local calendar date of every UTC midnight in one IANA zone.
+
+    The zone's offset history is folded into runs of "day shift" (-1, 0 or +1)
+    starting at a UTC day ordinal, so a whole sorted range of UTC ordinals is
+    projected to local ordinals with one bisect per run instead of one
+    `astimezone` call per day. Uses pytz's transition table, so results match
+    `datetime.combine(d, time(), tzinfo=utc).astimezone(tz).date()`.
+    """
+
+    def __init__(self, tzname: str):
+        self.tzname = tzname
+        self._starts = array("l")
+        self._shifts = array("b")
+
+        tz = pytz.timezone(tzname)
+        transitions = getattr(tz, "_utc_transition_times", None)
+        if not transitions:
+            self._add_run(1, tz.utcoffset(datetime(2000, 1, 1)).days)
+            return
+        for utc_dt, (offset, _dst, _abbr) in zip(transitions, tz._transition_info):
+            # the first UTC midnight at or after the transition instant
+            first_day = utc_dt.toordinal() + (0 if utc_dt.time() == datetime.min.time() else 1)
+            self._add_run(max(first_day, 1), offset.days)
+
+    def _add_run(self, start: int, shift: int) -> None:
+        if self._shifts and self._shifts[-1] == shift:
+            return
+        if self._starts and self._starts[-1] == start:
+            self._shifts[-1] = shift
+            return
+        self._starts.append(start)
+        self._shifts.append(shift)
+
+    def shift_at(self, utc_ordinal: int) -> int:
+        return self._shifts[max(bisect_right(self._starts, utc_ordinal) - 1, 0)]
+
+    def project(self, utc_ordinals: Sequence[int], lo: int = 0, hi: int | None = None) -> array:
+        """Local day ordinals for the sorted `utc_ordinals[lo:hi]`."""
+        if hi is None:
+            hi = len(utc_ordinals)
+        out = array("l")
+        if lo >= hi:
+            return out
+        run = max(bisect_right(self._starts, utc_ordinals[lo]) - 1, 0)
+        i = lo
+        while i < hi:
+            if run + 1 < len(self._starts):
+                j = bisect_left(utc_ordinals, self._starts[run + 1], i, hi)
+            else:
+                j = hi
+            shift = self._shifts[run]
+            if shift:
+                out.extend(o + shift for o in utc_ordinals[i:j])
+            else:
+                out.extend(utc_ordinals[i:j])
+            i = j
+            run += 1
+        return out
+
+
+@lru_cache(maxsize=None)
+def zone_transitions(tzname: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """
+    (UTC instants in epoch seconds, UTC offsets in seconds) for the zone; offset
+    i applies from instant i on. Fixed-offset zones have a single entry.
+    """
+    tz = pytz.timezone(tzname)
+    transitions = getattr(tz, "_utc_transition_times", None)
+    if not transitions:
+        return (_MIN_EPOCH,), (int(tz.utcoffset(datetime(2000, 1, 1)).total_seconds()),)
+    instants = tuple(_MIN_EPOCH if t.year == 1 else int((t - _EPOCH).total_seconds()) for t in transitions)
+    offsets = tuple(int(offset.total_seconds()) for offset, _dst, _abbr in tz._transition_info)
+    return instants, offsets
+
+
+@lru_cache(maxsize=None)
+def zone_info(tzname: str) -> ZoneInfo:
+    """Cached ZoneInfo per IANA zone name, for wall-clock "now" and local midnights."""
+    return ZoneInfo(tzname)
+
+
+@lru_cache(maxsize=None)
+def zone_projection(tzname: str) -> ZoneProjection:
+    """Cached projection table per IANA zone name."""
+    return ZoneProjection(tzname)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Per-request cost of resolving a country's zone, before and after the
+startup-built country -> zone map.
+
+"before" replays the original path of a /calendar/lunar request: scan
+`pytz.country_timezones`, then `pytz.timezone(tzname)` for "today" and again
+for the cache expiry. "after" is one dict lookup plus the cached ZoneInfo.
+The map is seeded from pytz's own country list, so no DB is needed.
+
+    SECRET=... python benchmarks/country_timezone.py
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import country_zones  # noqa: E402
+from app.services.timezones import zone_info  # noqa: E402
+
+CODES = ["IQ", "IR", "US", "DE", "SA", "AE", "TR", "EG", "XX"]
+
+
+def before(cc: str):
+    try:
+        zones = pytz.country_timezones(cc)
+        tzname = next((z for z in zones if not z.startswith("Etc/")), zones[0] if zones else "UTC")
+    except Exception:
+        tzname = "UTC"
+    today = datetime.now(pytz.timezone(tzname)).date()
+    return tzname, today, pytz.timezone(tzname)
+
+
+def after(cc: str):
+    tzname = country_zones.country_timezone(cc)
+    tz = zone_info(tzname)
+    return tzname, datetime.now(tz).date(), tz
+
+
+def _rate(fn, seconds: float = 1.0) -> float:
+    for cc in CODES:
+        fn(cc)  # warm up
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        for cc in CODES:
+            fn(cc)
+        n += len(CODES)
+    return n / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    country_zones._zones = {cc: country_zones._pytz_zone(cc) for cc in pytz.country_timezones}
+    for cc in CODES:
+        assert before(cc)[:2] == after(cc)[:2], cc
+    b, a = _rate(before), _rate(after)
+    print(f"country -> zone   before {b:12.0f} /s ({1e6 / b:.2f} us)   after {a:12.0f} /s ({1e6 / a:.2f} us)   x{a / b:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Throughput of /calendar/lunar response building, before and after the
+pre-serialized day fragments.
+
+"before" replays the original shaping loop (astimezone per row, dicts per
+relation, LunarResponse validation and serialization); "after" splices the
+cached fragments. Data comes from the bundled Baghdad JSON files, no DB needed.
+HTTP, auth and the response cache are excluded, so the numbers are
+handler-level requests/sec on a cold cache.
+
+    SECRET=... python benchmarks/lunar_response.py
+"""
+
+import json
+import os
+import sys
+import time
+from array import array
+from datetime import date, datetime, timezone
+from types import SimpleNamespace
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.calendar import LunarResponse  # noqa: E402
+from app.services import calendar_index, dimensions  # noqa: E402
+from app.services.calendar_index import CalendarIndex  # noqa: E402
+from app.services.hijri import hijri_iso, hijri_offset  # noqa: E402
+from app.services.lunar_json import encode_lunar_response  # noqa: E402
+
+DATA_FILES = [
+    "app/data/calendar/astrology/lunar_calendar_baghdad_2025.json",
+    "app/data/calendar/astrology/lunar_calendar_baghdad_2026.json",
+]
+
+
+def _seed() -> None:
+    ids = {"moonSign": {}, "phase": {}, "recommendations": {}}
+    tables = {"moonSign": dimensions.moon_signs, "phase": dimensions.phases, "recommendations": dimensions.recommendations}
+    columns = [array("l") for _ in range(5)]
+    for path in DATA_FILES:
+        with open(path, encoding="utf-8") as f:
+            days = json.load(f)["days"]
+        for day in days:
+            row = [date.fromisoformat(day["date"]).toordinal(), len(columns[0]) + 1]
+            for key, table in tables.items():
+                names = day[key]
+                pk = ids[key].setdefault(names["en"], len(ids[key]) + 1)
+                table.put(SimpleNamespace(id=pk, en_name=names["en"], ar_name=names["ar"], fa_name=names["fa"]))
+                row.append(pk)
+            for column, value in zip(columns, row):
+                column.append(value)
+    calendar_index._index = CalendarIndex(1, "", *columns)
+
+
+def before(envelope) -> bytes:
+    index = calendar_index.get_calendar_index()
+    tz = pytz.timezone(envelope.timezone)
+    items = []
+    for pos in index.span(envelope.start_utc, envelope.end_utc):
+        utc_d = index.utc_date(pos)
+        local_date = datetime.combine(utc_d, datetime.min.time(), tzinfo=timezone.utc).astimezone(tz).date()
+        related = {}
+        for name, table, ids in (
+            ("moon_sign", dimensions.moon_signs, index.moon_sign_ids),
+            ("phase", dimensions.phases, index.phase_ids),
+            ("recommendation", dimensions.recommendations, index.recommendation_ids),
+        ):
+            r = table[ids[pos]]
+            related[name] = {"id": r.id, "en_name": r.en_name, "ar_name": r.ar_name, "fa_name": r.fa_name}
+        hijri_date = hijri_iso(local_date.toordinal() + hijri_offset(envelope.country))
+        items.append({"id": index.ids[pos], "utc_date": utc_d, "local_date": local_date, "hijri_date": hijri_date, **related})
+    return LunarResponse(**dict(envelope), items=items).model_dump_json().encode()
+
+
+def after(envelope) -> bytes:
+    return encode_lunar_response(envelope)
+
+
+def _rate(fn, envelope, seconds: float = 1.0) -> float:
+    fn(envelope)  # warm up (builds fragments / tz tables)
+    n, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fn(envelope)
+        n += 1
+    return n / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    from app.api.v1.calendars import _lunar_envelope
+
+    _seed()
+    cases = [
+        ("one month, Asia/Baghdad", _lunar_envelope("IQ", "Asia/Baghdad", date(2025, 3, 1), date(2025, 3, 31))),
+        ("two years, America/New_York", _lunar_envelope("US", "America/New_York", date(2025, 1, 1), date(2026, 12, 31))),
+    ]
+    for label, envelope in cases:
+        assert before(envelope) == after(envelope)
+        b, a = _rate(before, envelope), _rate(after, envelope)
+        print(f"{label:32s} before {b:10.1f} req/s   after {a:10.1f} req/s   x{a / b:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Cost per (date, location) of the prayer-time engines, and how far the
+in-tree methods land from the praytimes library.
+
+"six_times" is `compute_six_times` (six events, one hour angle setup per
+event); "method scalar" and "method batched" are `method_times` and
+`method_times_minutes` (nine events from one shared ephemeris read).
+praytimes is optional: install it to add its row and the comparison.
+No DB needed.
+
+    SECRET=... python benchmarks/prayer_methods.py
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.prayer_methods import METHOD_EVENTS, METHODS, method_times, method_times_minutes  # noqa: E402
+from app.services.prayer_times import compute_six_times  # noqa: E402
+
+try:
+    from praytimes import PrayTimes
+except ImportError:  # optional, for comparison only
+    PrayTimes = None
+
+COMPARED = ("MWL", "ISNA", "Egypt", "Karachi", "Tehran", "Jafari")
+
+random.seed(7)
+FIRST = date(2025, 1, 1)
+CASES = [
+    (FIRST + timedelta(days=random.randrange(730)), random.uniform(-48, 48), random.uniform(-180, 180))
+    for _ in range(2000)
+]
+CASES = [(d, lat, lng, round(lng / 7.5) / 2) for d, lat, lng in CASES]
+
+
+def _praytimes(name: str):
+    pt = PrayTimes(name)
+    # the library keeps its settings on the class; give each instance its own copy
+    pt.settings = {"imsak": "10 min", "dhuhr": "0 min", "asr": "Standard", "highLats": "NightMiddle"}
+    pt.settings.update(PrayTimes.methods[name]["params"])
+    return pt
+
+
+def _rate(fn, cases) -> float:
+    fn(cases[:10])  # warm up
+    t0 = time.perf_counter()
+    fn(cases)
+    return len(cases) / (time.perf_counter() - t0)
+
+
+def six_times(cases):
+    for d, lat, lng, tz in cases:
+        compute_six_times(d, lat, lng, tz)
+
+
+def method_scalar(cases):
+    method = METHODS["Tehran"]
+    for d, lat, lng, tz in cases:
+        method_times(d, lat, lng, tz, method)
+
+
+def praytimes_scalar(cases):
+    pt = _praytimes("Tehran")
+    for d, lat, lng, tz in cases:
+        pt.getTimes(d, (lat, lng), tz)
+
+
+def _minutes(hhmm: str) -> int:
+    return int(hhmm[:2]) * 60 + int(hhmm[3:])
+
+
+def main() -> None:
+    rows = [("six_times", _rate(six_times, CASES)), ("method scalar", _rate(method_scalar, CASES))]
+    if PrayTimes is not None:
+        rows.append(("praytimes", _rate(praytimes_scalar, CASES)))
+
+    # a year of days for 200 locations in one call
+    ordinals = np.arange(FIRST.toordinal(), FIRST.toordinal() + 366)
+    coords = np.array([c[1:] for c in CASES[:200]])
+    t0 = time.perf_counter()
+    method_times_minutes(ordinals, coords[:, 0:1], coords[:, 1:2], coords[:, 2:3], METHODS["Tehran"])
+    rows.append(("method batched", ordinals.size * len(coords) / (time.perf_counter() - t0)))
+
+    for name, rate in rows:
+        print(f"{name:16s} {rate:12.0f} /s ({1e6 / rate:7.2f} us)")
+
+    if PrayTimes is None:
+        print("praytimes not installed; skipping the comparison")
+        return
+    # minute-level agreement; the ephemerides differ slightly, so a few minutes is expected
+    print("abs difference from praytimes, minutes (max / mean):")
+    for name in COMPARED:
+        pt, method = _praytimes(name), METHODS[name]
+        diffs = {event: [] for event in METHOD_EVENTS}
+        for d, lat, lng, tz in CASES:
+            ours, theirs = method_times(d, lat, lng, tz, method), pt.getTimes(d, (lat, lng), tz)
+            for event in METHOD_EVENTS:
+                delta = (_minutes(ours[event]) - _minutes(theirs[event]) + 720) % 1440 - 720
+                diffs[event].append(abs(delta))
+        print(f"  {name:8s}" + " ".join(f"{e} {max(v)}/{np.mean(v):.2f}" for e, v in diffs.items()))
+
+
+if __name__ == "__main__":
+    main()
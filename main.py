@@ -11,6 +11,11 @@ import uvicorn, os, logging
 from dotenv import load_dotenv
 from tortoise.contrib.fastapi import register_tortoise
 from app.models.user import User, Role
+from app.services.calendar_index import reload_calendar_index
+from app.services.country_zones import load_country_zones
+from app.services.dimensions import load_dimensions
+from app.services.hijri import load_hijri_offsets
+from app.services.province_registry import load_province_registry
 from fastapi.middleware.cors import CORSMiddleware
 
 # Public root
@@ -28,6 +33,11 @@ async def lifespan(app: FastAPI):
     # await FastAPILimiter.init(App().get_redis(sync=False))
     await Tortoise.init(config=TORTOISE_ORM)
     await Tortoise.generate_schemas()
+    await load_dimensions()
+    await load_country_zones()
+    await load_hijri_offsets()
+    await load_province_registry()
+    await reload_calendar_index()
     # await store_root_layer_information_subject_data()
     # await store_root_layer_information_content_data()
 
@@ -0,0 +1,15 @@
+from tortoise import BaseDBAsyncClient
+
+
+async def upgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        ALTER TABLE "calendars" ADD "utc_date" DATE;
+        UPDATE "calendars" SET "utc_date" = MAKE_DATE(CAST("utc_year" AS INT), CAST("utc_month" AS INT), CAST("utc_day" AS INT));
+        ALTER TABLE "calendars" ALTER COLUMN "utc_date" SET NOT NULL;
+        CREATE INDEX IF NOT EXISTS "idx_calendars_utc_dat_efd95a" ON "calendars" ("utc_date");"""
+
+
+async def downgrade(db: BaseDBAsyncClient) -> str:
+    return """
+        DROP INDEX IF EXISTS "idx_calendars_utc_dat_efd95a";
+        ALTER TABLE "calendars" DROP COLUMN "utc_date";"""
@@ -0,0 +1,4 @@
+import os
+
+# app.core.config requires a secret; the tests never sign anything with it
+os.environ.setdefault("SECRET", "test-secret-" + "x" * 32)
@@ -0,0 +1,46 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from app.api.v1 import calendars
+from app.services import http_cache
+from app.services.http_cache import ResponseCache
+
+TEHRAN = timezone(timedelta(hours=3, minutes=30))
+
+
+def test_day_end_is_the_next_local_midnight():
+    expires_at = calendars._province_day_end(TEHRAN, date(2026, 3, 20))
+    assert datetime.fromtimestamp(expires_at, TEHRAN) == datetime(2026, 3, 21, tzinfo=TEHRAN)
+
+
+def test_entry_expires_at_local_midnight(monkeypatch):
+    expires_at = calendars._province_day_end(TEHRAN, date(2026, 3, 20))
+    cache = ResponseCache(maxsize=4)
+    entry = cache.put("key", b"{}", expires_at=expires_at)
+
+    monkeypatch.setattr(http_cache.time, "time", lambda: expires_at - 1)
+    assert cache.get("key") is entry
+
+    monkeypatch.setattr(http_cache.time, "time", lambda: expires_at)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", b"1")
+    cache.put("b", b"2")
+    cache.get("a")
+    cache.put("c", b"3")
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_max_age_counts_down_to_expiry():
+    expires_at = datetime.now(timezone.utc).timestamp() + 100
+    directive, max_age = calendars._max_age_headers(expires_at)["Cache-Control"].split(", max-age=")
+    assert directive == "private"
+    assert int(max_age) == pytest.approx(100, abs=1)
+    assert calendars._max_age_headers(expires_at, shared=True)["Cache-Control"].startswith("public, ")
+    assert calendars._max_age_headers(expires_at - 1000)["Cache-Control"] == "private, max-age=0"
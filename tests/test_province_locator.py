@@ -0,0 +1,71 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from app.services.province_locator import EARTH_RADIUS_KM, ProvinceLocator
+from app.services.province_registry import ProvinceEntry
+
+
+def _great_circle_km(lat1, lng1, lat2, lng2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lng2 - lng1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _brute_force(entries, lats, lngs, lat, lng):
+    # haversine against every province
+    p1, p2 = math.radians(lat), np.radians(lats)
+    a = np.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(np.radians(lngs - lng) / 2) ** 2
+    return entries[int(np.argmin(a))]
+
+
+@pytest.fixture(scope="module")
+def provinces():
+    rng = random.Random(20)
+    return [
+        ProvinceEntry(i, f"XX-{i}", f"p{i}", rng.uniform(-90, 90), rng.uniform(-180, 180), 0.0, 1, "XX")
+        for i in range(3000)
+    ]
+
+
+@pytest.fixture(scope="module")
+def queries():
+    rng = random.Random(21)
+    return [(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(2000)]
+
+
+def test_nearest_matches_brute_force(provinces, queries):
+    locator = ProvinceLocator.build(1, provinces)
+    lats = np.array([p.lat for p in provinces])
+    lngs = np.array([p.lng for p in provinces])
+    for lat, lng in queries:
+        entry, km = locator.nearest(lat, lng)
+        expected = _brute_force(provinces, lats, lngs, lat, lng)
+        assert entry == expected, (lat, lng)
+        assert km == pytest.approx(_great_circle_km(lat, lng, entry.lat, entry.lng), abs=1e-6)
+
+
+def test_nearest_many_matches_nearest(provinces, queries):
+    locator = ProvinceLocator.build(1, provinces)
+    lats, lngs = zip(*queries)
+    for (lat, lng), (entry, km) in zip(queries, locator.nearest_many(lats, lngs)):
+        single, single_km = locator.nearest(lat, lng)
+        assert entry == single
+        assert km == pytest.approx(single_km, abs=1e-3)
+
+
+def test_skips_provinces_without_coordinates():
+    located = ProvinceEntry(1, "XX-1", "a", 10.0, 10.0, 0.0, 1, "XX")
+    unlocated = ProvinceEntry(2, "XX-2", "b", None, None, None, 1, "XX")
+    locator = ProvinceLocator.build(1, [located, unlocated])
+    assert len(locator) == 1
+    assert locator.nearest(0.0, 0.0)[0] == located
+
+
+def test_empty_locator():
+    locator = ProvinceLocator.build(1, [])
+    assert locator.nearest(0.0, 0.0) is None
+    assert locator.nearest_many([0.0], [0.0]) == []
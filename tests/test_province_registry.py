@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from tortoise import Tortoise
+
+from app.models.country import Country, Province
+from app.services import province_registry as registry
+
+
+def _run(scenario):
+    async def main():
+        await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["app.models.country"]})
+        await Tortoise.generate_schemas()
+        try:
+            await scenario()
+        finally:
+            await Tortoise.close_connections()
+
+    asyncio.run(main())
+
+
+@pytest.fixture(autouse=True)
+def empty_registry(monkeypatch):
+    monkeypatch.setattr(registry, "_provinces", {})
+
+
+async def _country():
+    return await Country.create(name="Iraq", label="Iraq", iso_alpha2="iq")
+
+
+def test_load_and_lookup():
+    async def scenario():
+        country = await _country()
+        await Province.create(
+            name="Baghdad", label="Baghdad", iso_3166_2="IQ-BG", country=country, lat=33.3, lng=44.4, tz=3.0
+        )
+        await registry.load_province_registry()
+        entry = await registry.get_province("IQ-BG")
+        assert (entry.name, entry.lat, entry.lng, entry.tz, entry.country_code) == ("Baghdad", 33.3, 44.4, 3.0, "IQ")
+        assert [p.iso_3166_2 for p in registry.country_provinces("iq")] == ["IQ-BG"]
+        assert await registry.get_province("IQ-XX") is None
+
+    _run(scenario)
+
+
+def test_saves_and_deletes_invalidate():
+    async def scenario():
+        country = await _country()
+        province = await Province.create(name="Basra", label="Basra", iso_3166_2="IQ-BA", country=country)
+        await registry.load_province_registry()
+        assert not (await registry.get_province("IQ-BA")).has_coordinates
+
+        version = registry.registry_version()
+        province.lat, province.lng, province.tz = 30.5, 47.8, 3.0
+        await province.save()
+        assert registry.registry_version() > version
+        assert (await registry.get_province("IQ-BA")).lat == 30.5
+
+        # a country edit is not visible on the province instance, but reaches the entry
+        country.iso_alpha2 = "IR"
+        await country.save()
+        assert (await registry.get_province("IQ-BA")).country_code == "IR"
+
+        await province.delete()
+        assert "IQ-BA" not in {p.iso_3166_2 for p in registry.province_entries()}
+
+    _run(scenario)
+
+
+def test_miss_falls_back_to_the_database():
+    async def scenario():
+        country = await _country()
+        await registry.load_province_registry()
+        # bulk writes skip the signals, as writes from another worker would
+        await Province.bulk_create(
+            [Province(name="Erbil", label="Erbil", iso_3166_2="IQ-AR", country=country, lat=36.2, lng=44.0, tz=3.0)]
+        )
+        version = registry.registry_version()
+        entry = await registry.get_province("IQ-AR")
+        assert entry.name == "Erbil"
+        assert registry.registry_version() > version
+        assert "IQ-AR" in {p.iso_3166_2 for p in registry.province_entries()}
+
+    _run(scenario)